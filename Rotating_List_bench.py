@@ -0,0 +1,268 @@
+"""
+Quran Parts PDF Generator - benchmark suite
+Times the engine's hot helpers (rotate_list, days_since_start,
+reshape_arabic, hex_to_rgb) and end-to-end generation of daily PDFs and of
+the single multi-page PDF over 1, 30, 365 and 3650 days, in English and in
+Arabic. Every benchmark is repeated until it has run for a minimum time and
+keeps its best and median time. Results can be saved as JSON and compared
+against a saved baseline; the run exits with status 1 when anything got
+slower than the threshold in both its best and its median time.
+
+Examples:
+    python Rotating_List_bench.py --font DejaVuSans.ttf --save baseline.json
+    python Rotating_List_bench.py --font DejaVuSans.ttf --days 1 30 --baseline baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import timeit
+from datetime import timedelta
+from importlib.metadata import version
+
+import Rotating_List_drawing as drawing
+import Rotating_List_engine as engine
+
+# ========================================
+# CONFIGURATION
+BENCH_VERSION = 2
+RANGE_SIZES = (1, 30, 365, 3650)
+LANGUAGES = ("english", "arabic")
+MICRO_REPEAT = 7             # timeit runs of the helpers, each at least 0.2 s
+SAMPLE_SECONDS = 0.2         # Generation calls are batched until one sample takes this long
+MIN_SAMPLES = 5              # Samples per generation benchmark...
+MIN_TOTAL_SECONDS = 1.0      # ...and at least this much time in all...
+MAX_TOTAL_SECONDS = 10.0     # ...unless the samples so far already took this long
+REGRESSION_THRESHOLD = 0.10  # Slower than the baseline by more than 10% fails
+SHORT_RUN_SECONDS = 0.010    # Below 10 ms per op, timings vary more from run to run...
+SHORT_RUN_THRESHOLD = 0.30   # ...so those fail only when more than 30% slower
+REGRESSION_FLOOR_SECONDS = 50e-6  # and never for less than 50 µs per op, little next to a page's ~2 ms
+
+# ========================================
+# TIMING
+def time_micro(func):
+    # Seconds per call: timeit picks the loop count; the best and the median
+    # run are kept
+    timer = timeit.Timer(func)
+    loops, _ = timer.autorange()
+    runs = sorted(timer.repeat(repeat=MICRO_REPEAT, number=loops))
+    return {"seconds": runs[0] / loops, "median": runs[len(runs) // 2] / loops, "ops": loops}
+
+def batch_sizes():
+    # 1, 2, 5, 10, 20, 50, ... calls, the steps of timeit.autorange
+    scale = 1
+    while True:
+        for step in (1, 2, 5):
+            yield step * scale
+        scale *= 10
+
+def time_calls(func, number):
+    started = time.perf_counter()
+    for _ in range(number):
+        func()
+    return time.perf_counter() - started
+
+def time_run(func, ops):
+    # Seconds per op of func, which does `ops` operations per call. As in
+    # timeit.autorange, calls are batched (1, 2, 5, 10, ...) until a sample
+    # takes SAMPLE_SECONDS; then samples are taken until there are
+    # MIN_SAMPLES and MIN_TOTAL_SECONDS, so short ranges get many more runs
+    # than long ones. The best and the median sample are kept.
+    for number in batch_sizes():
+        elapsed = time_calls(func, number)
+        if elapsed >= SAMPLE_SECONDS:
+            break
+    samples, total = [elapsed / number], elapsed
+    while total < MIN_TOTAL_SECONDS or (len(samples) < MIN_SAMPLES and total < MAX_TOTAL_SECONDS):
+        elapsed = time_calls(func, number)
+        samples.append(elapsed / number)
+        total += elapsed
+    samples.sort()
+    return {"seconds": samples[0] / ops, "median": samples[len(samples) // 2] / ops, "ops": ops,
+            "total": samples[0], "calls": number * len(samples)}
+
+# ========================================
+# BENCHMARKS
+def bench_helpers(results, language):
+    names = list(engine.DEFAULT_NAMES)
+    date = engine.START_DATE + timedelta(days=1000)
+    colors = list(engine.DEFAULT_COLORS.values())
+
+    results[f"rotate_list[{language}]"] = time_micro(lambda: list(engine.rotate_list(names, 1000)))
+    results[f"days_since_start[{language}]"] = time_micro(lambda: engine.days_since_start(engine.START_DATE, date))
+    results[f"hex_to_rgb[{language}]"] = time_micro(lambda: [engine.hex_to_rgb(color) for color in colors])
+
+    texts = names + list(engine.HEADERS)
+
+    def shape_cold():
+        engine.shaping_cache.clear()
+        for text in texts:
+            engine.reshape_arabic(text)
+
+    def shape_warm():
+        for text in texts:
+            engine.reshape_arabic(text)
+
+    results[f"reshape_arabic[{language},cold]"] = time_micro(shape_cold)
+    shape_warm()
+    results[f"reshape_arabic[{language},warm]"] = time_micro(shape_warm)
+
+def bench_generation(results, language, days, workers):
+    names = list(engine.DEFAULT_NAMES)
+    start = engine.START_DATE
+    end = start + timedelta(days=days - 1)
+
+    with tempfile.TemporaryDirectory() as folder:
+        engine.shaping_cache_file = os.path.join(folder, "shaping_cache.json")
+
+        def files():
+            engine.generate_pdf_range(names, start, end, folder, engine.DEFAULT_COLORS, workers=workers, force=True)
+
+        def document():
+            engine.generate_pdf_document(names, start, end, os.path.join(folder, "schedule.pdf"), engine.DEFAULT_COLORS)
+
+        pages = len(engine.page_chunks(names))
+        removed = drawing.removed_ops()
+        result = results[f"generate_pdf_range[{language},{days}d]"] = time_run(files, days)
+        # Redundant state changes left out per run (in this process, so with --workers 1)
+        result["removed_ops"] = (drawing.removed_ops() - removed) // result["calls"]
+        day_files = {engine.day_filename(date) for date in engine.date_range(start, end)}
+        sizes = [os.path.getsize(os.path.join(folder, name)) for name in day_files]
+        results[f"generate_pdf_range[{language},{days}d]"]["bytes_per_page"] = sum(sizes) // (len(sizes) * pages)
+        removed = drawing.removed_ops()
+        result = results[f"generate_pdf_document[{language},{days}d]"] = time_run(document, days)
+        result["removed_ops"] = (drawing.removed_ops() - removed) // result["calls"]
+        document_size = os.path.getsize(os.path.join(folder, "schedule.pdf"))
+        results[f"generate_pdf_document[{language},{days}d]"]["bytes_per_page"] = document_size // (days * pages)
+
+def run_benchmarks(sizes=RANGE_SIZES, languages=LANGUAGES, workers=1, helpers=True):
+    results = {}
+    for language in languages:
+        if engine.set_language(language == "arabic") != (language == "arabic"):
+            print(f"⚠️ Skipping {language}: its libraries are not installed")
+            continue
+        if helpers:
+            print(f"⏱️ {language}: helpers")
+            bench_helpers(results, language)
+        for days in sizes:
+            print(f"⏱️ {language}: {days} days")
+            bench_generation(results, language, days, workers)
+    return results
+
+# ========================================
+# REPORTS
+def environment():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "fpdf2": version("fpdf2"),
+        "font": [os.path.basename(path) for path in engine.font_files()],
+        "cpus": os.cpu_count(),
+    }
+
+def save_report(filename, results):
+    report = {"version": BENCH_VERSION, "environment": environment(), "results": results}
+    tmp_file = filename + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp_file, filename)
+
+def load_report(filename):
+    with open(filename, "r", encoding="utf-8") as f:
+        report = json.load(f)
+    if report.get("version") != BENCH_VERSION:
+        raise ValueError(f"{filename} is not a version {BENCH_VERSION} benchmark file")
+    return report
+
+def allowed_change(seconds, threshold):
+    # The slowdown tolerated for a benchmark taking `seconds` per op
+    return threshold if seconds >= SHORT_RUN_SECONDS else max(threshold, SHORT_RUN_THRESHOLD)
+
+def relative_change(old, new):
+    return new / old - 1 if old else 0.0
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    # Returns [(name, baseline seconds, seconds, change, allowed change)]
+    # for benchmarks in both runs, and the names of the regressions: slower
+    # than allowed in both the best and the median time, so a single noisy
+    # sample on either side doesn't fail the run, and by more than
+    # REGRESSION_FLOOR_SECONDS per op, as the helpers taking nano- to
+    # microseconds vary by more than any useful threshold
+    rows, regressions = [], []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old, new = baseline[name]["seconds"], result["seconds"]
+        change = relative_change(old, new)
+        median_change = relative_change(baseline[name]["median"], result["median"])
+        allowed = allowed_change(old, threshold)
+        rows.append((name, old, new, change, allowed))
+        if min(change, median_change) > allowed and new - old > REGRESSION_FLOOR_SECONDS:
+            regressions.append(name)
+    return rows, regressions
+
+def format_seconds(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+def print_results(results):
+    for name, result in results.items():
+        size = f"  {result['bytes_per_page']:>7} bytes/page" if "bytes_per_page" in result else ""
+        removed = f"  {result['removed_ops']:>6} state ops removed" if "removed_ops" in result else ""
+        print(f"{name:45} {format_seconds(result['seconds']):>10} per op{size}{removed}")
+
+def print_comparison(rows, regressions):
+    for name, old, new, change, allowed in rows:
+        mark = "❌" if name in regressions else "✅"
+        print(f"{mark} {name:45} {format_seconds(old):>10} → {format_seconds(new):>10} ({change:+.1%})")
+
+# ========================================
+# MAIN
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Quran Parts PDF Generator benchmarks")
+    parser.add_argument("--days", type=int, nargs="+", default=list(RANGE_SIZES), help="range sizes in days")
+    parser.add_argument("--language", choices=LANGUAGES, nargs="+", default=list(LANGUAGES))
+    parser.add_argument("--font", help="TTF font file (default: best installed font for the language)")
+    parser.add_argument("--small", action="store_true", help="size-optimized PDFs (fonts without hinting)")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes for daily PDFs (default: 1)")
+    parser.add_argument("--no-helpers", action="store_true", help="only time PDF generation")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against results saved with --save")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="allowed slowdown against the baseline (default: 0.10, at least 0.30 below 10 ms per op)")
+    args = parser.parse_args(argv)
+
+    if args.font:
+        engine.FONT_PATH = args.font
+    engine.SMALL_OUTPUT = args.small
+    try:
+        baseline = load_report(args.baseline)["results"] if args.baseline else None
+        results = run_benchmarks(args.days, args.language, args.workers, helpers=not args.no_helpers)
+        print_results(results)
+        if args.save:
+            save_report(args.save, results)
+            print(f"💾 Saved results to {args.save}")
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+
+    if baseline is None:
+        return 0
+    rows, regressions = compare(results, baseline, args.threshold)
+    print_comparison(rows, regressions)
+    if regressions:
+        print(f"❌ {len(regressions)} benchmarks slower than the baseline by more than {args.threshold:.0%} "
+              f"({SHORT_RUN_THRESHOLD:.0%} below {SHORT_RUN_SECONDS * 1000:.0f} ms per op, "
+              f"and by at least {format_seconds(REGRESSION_FLOOR_SECONDS)})", file=sys.stderr)
+        return 1
+    print(f"✅ No regressions against {args.baseline}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,365 @@
+"""
+Quran Parts PDF Generator - headless command line for the v2/v3 engine
+Generates schedules for a date range without loading tkinter/customtkinter,
+for cron jobs and servers without a display.
+
+Examples:
+    python Rotating_List_cli.py generate --start 2025/08/16 --end 2026/08/15 \
+        --output /srv/parts --colors theme.json --names names.txt
+    python Rotating_List_cli.py groups groups.json --start 2025/09/01 --end 2025/09/30 \
+        --output /srv/parts
+    python Rotating_List_cli.py export schedule.csv --start 2025/08/16 --end 2030/08/15
+    python Rotating_List_cli.py serve --port 8000
+    python Rotating_List_cli.py precompute --days 14 --output /srv/parts --colors theme.json
+    python Rotating_List_cli.py fonts --rescan
+    python Rotating_List_cli.py roster replace "Oliver" "Zaid" --from 2025/09/01
+    python Rotating_List_cli.py roster list
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+from collections import Counter
+from datetime import datetime
+
+import Rotating_List_engine as engine
+import Rotating_List_export as export_module
+import Rotating_List_fonts as fonts_module
+import Rotating_List_groups as groups_module
+import Rotating_List_precompute as precompute_module
+import Rotating_List_server as server_module
+
+# ========================================
+# ARGUMENT HELPERS
+def parse_date(text):
+    for fmt in ("%Y/%m/%d", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(text.strip(), fmt)
+        except ValueError:
+            pass
+    raise argparse.ArgumentTypeError(f"invalid date '{text}' (use YYYY/MM/DD)")
+
+def load_colors(path):
+    # A theme file is a JSON object with any of the DEFAULT_COLORS keys
+    colors = dict(engine.DEFAULT_COLORS)
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            theme = json.load(f)
+        unknown = set(theme) - set(colors)
+        if unknown:
+            raise ValueError(f"unknown color keys in {path}: {', '.join(sorted(unknown))}")
+        colors.update(theme)
+    for key, value in colors.items():
+        engine.hex_to_rgb(value)  # raises ValueError on a malformed color
+    return colors
+
+def load_roster(path):
+    # A names file, or without one the roster versions in roster.db
+    if not path:
+        return engine.get_roster_store()
+    # Keep the Arabic shaping cache next to the names file being used
+    engine.shaping_cache_file = os.path.join(os.path.dirname(os.path.abspath(path)), "shaping_cache.json")
+    engine.load_shaping_cache()
+    return engine.read_names(path)
+
+def add_range_arguments(parser, names=True):
+    today = datetime.now().strftime("%Y/%m/%d")
+    parser.add_argument("--start", type=parse_date, default=today, help="first date, YYYY/MM/DD (default: today)")
+    parser.add_argument("--end", type=parse_date, default=today, help="last date, YYYY/MM/DD (default: today)")
+    if names:
+        parser.add_argument("--names", help="names file, one name per line (default: the roster versions in roster.db)")
+    parser.add_argument("--colors", help="JSON color theme file (default: the GUI's default colors)")
+    parser.add_argument("--font", help="TTF font file (default: best installed font for the language)")
+    parser.add_argument("--small", action="store_true", help="size-optimized PDFs (fonts without hinting)")
+
+def apply_font(args):
+    if args.font:
+        engine.FONT_PATH = args.font
+    if getattr(args, "small", False):
+        engine.SMALL_OUTPUT = True
+
+def apply_profile(args):
+    # Returns the dict a profiled run fills in, or None without --profile
+    if not args.profile:
+        return None
+    engine.PROFILE_STAGES = True
+    return {}
+
+def roster_pages(names, date):
+    # Pages per daily PDF of the roster in effect on date
+    return len(engine.page_chunks(engine.names_on(names, date)))
+
+def report_size(paths, pages_per_file):
+    # Total size and bytes per page of the given output files (a range over
+    # a year repeats MM-DD names, each file counts once)
+    sizes = [os.path.getsize(path) for path in dict.fromkeys(paths) if os.path.exists(path)]
+    print(f"📦 {engine.format_size(sum(sizes), len(sizes) * pages_per_file)}")
+
+def report_profile(profile, folder):
+    if profile:
+        print(f"📊 {engine.format_profile(profile)}")
+        print(f"📊 Stage times per day: {os.path.join(folder, engine.PROFILE_FILE)}")
+
+# ========================================
+# COMMANDS
+def cmd_generate(args):
+    if args.start > args.end:
+        print("❌ Start date must be before or equal to end date", file=sys.stderr)
+        return 2
+    apply_font(args)
+    names = load_roster(args.names)
+    colors = load_colors(args.colors)
+    if not names:
+        print("❌ The names file is empty", file=sys.stderr)
+        return 2
+    os.makedirs(args.output, exist_ok=True)
+    profile = apply_profile(args)
+    pages = roster_pages(names, args.end)
+
+    if args.single:
+        filename = os.path.join(args.output, engine.document_filename(args.start, args.end))
+        pages = engine.generate_pdf_document(names, args.start, args.end, filename, colors, profile=profile)
+        print(f"✅ Generated one PDF with {pages} pages: {filename}")
+        report_size([filename], pages)
+        report_profile(profile, args.output)
+        return 0
+
+    if args.archive:
+        filename = os.path.join(args.output, engine.archive_filename(args.start, args.end))
+        written, failures = engine.generate_pdf_archive(names, args.start, args.end, filename, colors,
+                                                        workers=args.workers, profile=profile)
+        print(f"✅ Archived {written} PDFs: {filename}")
+        report_size([filename], written * pages)
+        report_profile(profile, args.output)
+        for date, error in failures:
+            print(f"❌ {date.strftime('%Y/%m/%d')}: {error}", file=sys.stderr)
+        return 1 if failures else 0
+
+    generated, skipped, failures = engine.generate_pdf_range(
+        names, args.start, args.end, args.output, colors, workers=args.workers, force=args.force,
+        profile=profile)
+    print(f"✅ Generated {generated} PDFs ({skipped} unchanged) in {args.output}")
+    report_size([os.path.join(args.output, engine.day_filename(date))
+                 for date in engine.date_range(args.start, args.end)], pages)
+    report_profile(profile, args.output)
+    for date, error in failures:
+        print(f"❌ {date.strftime('%Y/%m/%d')}: {error}", file=sys.stderr)
+    return 1 if failures else 0
+
+def cmd_groups(args):
+    if args.start > args.end:
+        print("❌ Start date must be before or equal to end date", file=sys.stderr)
+        return 2
+    apply_font(args)
+    groups = groups_module.load_groups(args.groups_file, load_colors(args.colors))
+    os.makedirs(args.output, exist_ok=True)
+    profile = apply_profile(args)
+
+    if args.single:
+        pages = groups_module.generate_group_documents(groups, args.start, args.end, args.output)
+        for name, count in pages.items():
+            print(f"✅ {name}: one PDF with {count} pages")
+        if profile is not None:
+            print(f"📊 Stage times per day: {engine.PROFILE_FILE} in each group's folder")
+        return 0
+
+    summary = groups_module.generate_groups(groups, args.start, args.end, args.output,
+                                            workers=args.workers, force=args.force, profile=profile)
+    failed = 0
+    for name, (generated, skipped, failures) in summary.items():
+        print(f"✅ {name}: {generated} PDFs ({skipped} unchanged)")
+        for date, error in failures:
+            print(f"❌ {name} {date.strftime('%Y/%m/%d')}: {error}", file=sys.stderr)
+        failed += len(failures)
+    print(f"📁 {len(summary)} groups in {args.output}")
+    report_profile(profile, args.output)
+    return 1 if failed else 0
+
+def cmd_export(args):
+    if args.start > args.end:
+        print("❌ Start date must be before or equal to end date", file=sys.stderr)
+        return 2
+    if args.groups:
+        groups = groups_module.load_groups(args.groups)
+    elif not args.names:
+        groups = export_module.roster_groups(engine.get_roster_store(), args.start, args.end)
+    else:
+        names = load_roster(args.names)
+        if not names:
+            print("❌ The names file is empty", file=sys.stderr)
+            return 2
+        groups = [{"name": "", "start_date": engine.START_DATE, "names": names}]
+    rows = export_module.export_schedule(groups, args.start, args.end, args.output)
+    print(f"✅ Exported {rows} rows to {args.output}")
+    return 0
+
+def cmd_fonts(args):
+    index = fonts_module.load_font_index(engine.font_index_file, rescan=args.rescan)
+    print(f"🔤 {len(index['fonts'])} fonts indexed in {engine.font_index_file}")
+    for arabic, language in ((False, "English"), (True, "Arabic")):
+        try:
+            regular, bold = fonts_module.find_font_files(index, arabic)
+        except ValueError as e:
+            print(f"⚠️ {language}: {e}")
+            continue
+        print(f"✅ {language}: {regular}" + (f" + {bold}" if bold != regular else ""))
+    return 0
+
+def cmd_roster(args):
+    store = engine.get_roster_store()
+    if args.action == "list":
+        previous = None
+        for effective, names, saved_at in store.versions():
+            changes = ""
+            if previous is not None:
+                added = list((Counter(names) - Counter(previous)).elements())
+                removed = list((Counter(previous) - Counter(names)).elements())
+                changes = " ".join([f"+{name}" for name in added] + [f"-{name}" for name in removed])
+            print(f"📅 {effective.strftime('%Y/%m/%d')}  {len(names)} names  saved {saved_at}  {changes}".rstrip())
+            previous = names
+        return 0
+
+    if args.action == "show":
+        for part, name in enumerate(engine.names_on(store, args.date), 1):
+            print(f"{part:>3}  {name}")
+        return 0
+
+    if args.action == "remove":
+        if not engine.remove_names(args.date):
+            print(f"❌ No roster version starts on {args.date.strftime('%Y/%m/%d')}", file=sys.stderr)
+            return 2
+        print(f"✅ Removed the roster version of {args.date.strftime('%Y/%m/%d')}")
+        return 0
+
+    if args.action == "set":
+        names = engine.read_names(args.names_file)
+        if not names:
+            print("❌ The names file is empty", file=sys.stderr)
+            return 2
+    else:
+        # The roster in part order on that date with one name swapped, so
+        # everyone else keeps their place in the rotation
+        names = list(engine.names_on(store, args.date))
+        if args.old not in names:
+            print(f"❌ '{args.old}' is not in the roster on {args.date.strftime('%Y/%m/%d')}", file=sys.stderr)
+            return 2
+        names[names.index(args.old)] = args.new
+    engine.save_names(names, args.date)
+    print(f"✅ Roster of {len(names)} names in effect from {args.date.strftime('%Y/%m/%d')}")
+    return 0
+
+def cmd_serve(args):
+    apply_font(args)
+    roster = load_roster(args.names)  # Checks the file and sets up its shaping cache
+    if args.names and not roster:
+        print("❌ The names file is empty", file=sys.stderr)
+        return 2
+    server_module.serve(args.names or roster, load_colors(args.colors),
+                        host=args.host, port=args.port, cache_size=args.cache_size)
+    return 0
+
+def cmd_precompute(args):
+    apply_font(args)
+    roster = load_roster(args.names)
+    load_colors(args.colors)  # Fails now on a broken theme instead of in the loop
+    if args.names and not roster:
+        print("❌ The names file is empty", file=sys.stderr)
+        return 2
+    failures = precompute_module.precompute(args.names or roster, args.output, days=args.days,
+                                            colors_file=args.colors, load_colors=load_colors,
+                                            interval=args.interval, once=args.once)
+    return 1 if failures else 0
+
+# ========================================
+# MAIN
+def build_parser():
+    parser = argparse.ArgumentParser(description="Quran Parts PDF Generator (headless)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="generate PDFs for a date range")
+    add_range_arguments(generate)
+    generate.add_argument("--output", default=engine.folder_path, help="output folder (default: Desktop/Parts)")
+    generate.add_argument("--workers", type=int, default=engine.PDF_WORKERS, help="worker processes (default: one per core)")
+    layout = generate.add_mutually_exclusive_group()
+    layout.add_argument("--single", action="store_true", help="write one multi-page PDF instead of MM-DD.pdf files")
+    layout.add_argument("--archive", action="store_true", help="write one ZIP of daily PDFs with a date index")
+    generate.add_argument("--force", action="store_true", help="rebuild days the manifest marks as unchanged")
+    generate.add_argument("--profile", action="store_true", help="record time and memory per stage into profile.json")
+    generate.set_defaults(func=cmd_generate)
+
+    groups = commands.add_parser("groups", help="generate PDFs for every group in a groups file")
+    groups.add_argument("groups_file", help="JSON list of groups (see Rotating_List_groups.py)")
+    add_range_arguments(groups, names=False)
+    groups.add_argument("--output", default=engine.folder_path, help="output folder, one subfolder per group")
+    groups.add_argument("--workers", type=int, default=engine.PDF_WORKERS, help="worker processes (default: one per core)")
+    groups.add_argument("--single", action="store_true", help="write one multi-page PDF per group")
+    groups.add_argument("--force", action="store_true", help="rebuild days the manifest marks as unchanged")
+    groups.add_argument("--profile", action="store_true", help="record time and memory per stage into profile.json")
+    groups.set_defaults(func=cmd_groups)
+
+    export = commands.add_parser("export", help="write the schedule as CSV or Parquet instead of PDFs")
+    export.add_argument("output", help="output file, .csv or .parquet (Parquet needs pyarrow)")
+    add_range_arguments(export)
+    export.add_argument("--groups", help="export every group in a groups file instead of --names")
+    export.set_defaults(func=cmd_export)
+
+    fonts = commands.add_parser("fonts", help="show the fonts picked from the installed font index")
+    fonts.add_argument("--rescan", action="store_true", help="rebuild the index from the font folders")
+    fonts.set_defaults(func=cmd_fonts)
+
+    roster = commands.add_parser("roster", help="list or change the roster versions in roster.db")
+    actions = roster.add_subparsers(dest="action", required=True)
+    actions.add_parser("list", help="every version with its effective date and who joined or left")
+    show = actions.add_parser("show", help="the names in part order on a date")
+    show.add_argument("--date", type=parse_date, default=datetime.now().strftime("%Y/%m/%d"),
+                      help="YYYY/MM/DD (default: today)")
+    roster_set = actions.add_parser("set", help="a new roster from a date on")
+    roster_set.add_argument("names_file", help="names in part order on that date, one per line")
+    replace = actions.add_parser("replace", help="swap one name from a date on, keeping the rotation")
+    replace.add_argument("old")
+    replace.add_argument("new")
+    for action in (roster_set, replace):
+        action.add_argument("--from", dest="date", type=parse_date, default=datetime.now().strftime("%Y/%m/%d"),
+                            help="effective date, YYYY/MM/DD (default: today)")
+    remove = actions.add_parser("remove", help="drop the version starting on a date")
+    remove.add_argument("--from", dest="date", type=parse_date, required=True, help="its effective date, YYYY/MM/DD")
+    roster.set_defaults(func=cmd_roster)
+
+    serve = commands.add_parser("serve", help="serve /schedule/YYYY-MM-DD.pdf over HTTP")
+    serve.add_argument("--names", help="names file, re-read when it changes (default: the roster versions in roster.db)")
+    serve.add_argument("--colors", help="JSON color theme file (default: the GUI's default colors)")
+    serve.add_argument("--font", help="TTF font file (default: best installed font for the language)")
+    serve.add_argument("--small", action="store_true", help="size-optimized PDFs (fonts without hinting)")
+    serve.add_argument("--host", default="127.0.0.1", help="address to listen on (default: this machine only)")
+    serve.add_argument("--port", type=int, default=8000, help="port (default: 8000)")
+    serve.add_argument("--cache-size", type=int, default=server_module.SCHEDULE_CACHE_SIZE,
+                       help="rendered days kept in memory")
+    serve.set_defaults(func=cmd_serve)
+
+    precompute = commands.add_parser("precompute", help="keep the PDFs of the next days generated")
+    precompute.add_argument("--days", type=int, default=precompute_module.PRECOMPUTE_DAYS,
+                            help=f"days kept ready, today included (default: {precompute_module.PRECOMPUTE_DAYS})")
+    precompute.add_argument("--output", default=engine.folder_path, help="output folder (default: Desktop/Parts)")
+    precompute.add_argument("--names", help="names file, re-read when it changes (default: the roster versions in roster.db)")
+    precompute.add_argument("--colors", help="JSON color theme file, re-read when it changes")
+    precompute.add_argument("--font", help="TTF font file (default: best installed font for the language)")
+    precompute.add_argument("--small", action="store_true", help="size-optimized PDFs (fonts without hinting)")
+    precompute.add_argument("--interval", type=float, default=precompute_module.CHECK_INTERVAL,
+                            help="seconds between checks for a new day or changed names and colors")
+    precompute.add_argument("--once", action="store_true", help="bring the window up to date and exit (for cron)")
+    precompute.set_defaults(func=cmd_precompute)
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        return args.func(args)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+Quran Parts PDF Generator - graphics state tracking
+The table code of all three versions sets the fill color, text color and font
+before every cell, changed or not. GraphicsState remembers what is in effect
+in the content stream being drawn, so only real changes are written; StatePDF
+is an FPDF whose color, font and line width setters skip the calls that would
+not change anything. Both count the operations they left out.
+"""
+
+from fpdf import FPDF
+
+_removed_total = 0
+
+def removed_ops():
+    # State changes left out in this process so far
+    return _removed_total
+
+# ========================================
+# GRAPHICS STATE
+class GraphicsState:
+    # The value behind each state operator (rg, RG, Tf, w, ...) of one
+    # content stream. A new stream, or the part after a Q, starts with a new
+    # state, as nothing is known to be in effect there.
+    def __init__(self, values=None):
+        self.values = dict(values or {})
+        self.removed = 0
+
+    def copy(self):
+        # For streams that continue this one, e.g. a cached table skeleton
+        return GraphicsState(self.values)
+
+    def unchanged(self, key, value):
+        # True, and counted as removed, when value is already in effect
+        global _removed_total
+        if key in self.values and self.values[key] == value:
+            self.removed += 1
+            _removed_total += 1
+            return True
+        return False
+
+    def record(self, key, value):
+        self.values[key] = value
+
+    def changed(self, key, value):
+        # True when the operator setting value has to be written
+        if self.unchanged(key, value):
+            return False
+        self.record(key, value)
+        return True
+
+# ========================================
+# FPDF
+class StatePDF(FPDF):
+    # Each setter remembers the arguments of its last call together with the
+    # FPDF attribute they produced. A repeated call is skipped only while that
+    # attribute is still the same, so FPDF restoring its state on a new page
+    # or after a local context is never second-guessed.
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.state = GraphicsState()
+
+    def set_fill_color(self, r, g=-1, b=-1):
+        if self.state.unchanged("fill", (r, g, b, self.fill_color)):
+            return
+        super().set_fill_color(r, g, b)
+        self.state.record("fill", (r, g, b, self.fill_color))
+
+    def set_text_color(self, r, g=-1, b=-1):
+        if self.state.unchanged("text", (r, g, b, self.text_color)):
+            return
+        super().set_text_color(r, g, b)
+        self.state.record("text", (r, g, b, self.text_color))
+
+    def set_draw_color(self, r, g=-1, b=-1):
+        if self.state.unchanged("draw", (r, g, b, self.draw_color)):
+            return
+        super().set_draw_color(r, g, b)
+        self.state.record("draw", (r, g, b, self.draw_color))
+
+    def set_line_width(self, width):
+        # FPDF writes "w" on every call, even for the width already set
+        if self.state.unchanged("line_width", (width, self.line_width)):
+            return
+        super().set_line_width(width)
+        self.state.record("line_width", (width, self.line_width))
+
+    def set_font(self, family=None, style="", size=0):
+        current = (self.font_family, self.font_style, self.font_size_pt, self.current_font)
+        if self.state.unchanged("font", (family, style, size) + current):
+            return
+        super().set_font(family, style, size)
+        current = (self.font_family, self.font_style, self.font_size_pt, self.current_font)
+        self.state.record("font", (family, style, size) + current)
@@ -0,0 +1,1254 @@
+"""
+Quran Parts PDF Generator - shared PDF engine for v2 and v3 (no GUI imports)
+Holds the configuration, rotation helpers and PDF rendering used by both GUIs.
+Toggle USE_ARABIC = True/False at the top for language choice.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import tracemalloc
+import zipfile
+from collections.abc import Sequence
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from importlib.metadata import PackageNotFoundError, version
+from io import BytesIO
+from pathlib import Path
+from fontTools import subset as ftsubset
+from fontTools import ttLib
+from fpdf import FPDF
+from fpdf.fonts import SubsetMap, TTFFont
+from Rotating_List_drawing import GraphicsState, StatePDF
+from Rotating_List_fonts import find_font_files, load_font_index
+from Rotating_List_roster import RosterStore
+from Rotating_List_writer import K, PAGE_H, StreamingPDFWriter
+
+# ========================================
+# TOGGLE LANGUAGE SUPPORT HERE
+USE_ARABIC = False  # Set True for Arabic names/headers (requires extra pip installs)
+
+# ========================================
+# CONFIGURATION
+FONT_PATH = None  # None = best installed font for the language, or a TTF file used for every face
+START_DATE = datetime(2025, 8, 16)
+PDF_WORKERS = None  # Worker processes for date ranges (None = one per CPU core, 1 = no pool)
+USE_DIRECT_WRITER = True  # Write daily PDFs as PDF operators directly (False = FPDF cells, see USE_PAGE_TEMPLATE)
+USE_PAGE_TEMPLATE = True  # Stamp each day onto a cached page per color theme (False = draw every cell)
+NAMES_SAVE_DELAY = 0.5  # Seconds without edits before names.txt is written
+PARTS_PER_PAGE = 30  # One khatma per page; larger rosters continue on the next page
+ROWS_PER_COLUMN = 15  # Parts 1-15 in the right column, 16-30 in the left
+PROFILE_STAGES = False  # Record time and peak memory per stage and day into profile.json
+SMALL_OUTPUT = False  # Size-optimized PDFs: embedded fonts without TrueType hinting
+desktop_path = os.path.join(os.path.expanduser("~"), "Desktop")
+folder_name = "Parts"
+folder_path = os.path.join(desktop_path, folder_name)
+os.makedirs(folder_path, exist_ok=True)
+names_file = os.path.join(folder_path, "names.txt")
+roster_db_file = os.path.join(folder_path, "roster.db")
+shaping_cache_file = os.path.join(folder_path, "shaping_cache.json")
+font_index_file = os.path.join(folder_path, "font_index.json")
+DEFAULT_COLORS = {
+    "header_fill": "#000000",
+    "header_text": "#FFFFFF",
+    "row_bg1": "#ababab",
+    "row_bg2": "#FFFFFF",
+    "names_bg": "#000000",
+    "text": "#FFFFFF",
+    "numbers": "#ff0000",
+    "borders": "#00af50",
+}
+
+# Language content
+ENGLISH_HEADERS = ["Part #", "Name", "Part #", "Name"]
+ENGLISH_NAMES = [
+    "Nathan", "Michael", "Taylor", "Jessica", "Alex", "Sarah", "David", "Emily",
+    "James", "Olivia", "Sarah", "David", "Michael", "Andrew", "Henry",
+    "Bella", "Rachel", "Samuel", "Oliver", "Mia", "Riley", "Isaac",
+    "Noah James", "Sophia", "Russell", "Nora", "Susan", "Noah Andrew", "Amy", "Oscar"
+]
+ARABIC_HEADERS = ["رقم الجزء", "الاسم", "رقم الجزء", "الاسم"]
+ARABIC_DAYS = {
+    "Monday": "الاثنين", "Tuesday": "الثلاثاء", "Wednesday": "الأربعاء",
+    "Thursday": "الخميس", "Friday": "الجمعة", "Saturday": "السبت", "Sunday": "الأحد"
+}
+ARABIC_NAMES = [
+    "عبدالله", "فاطمة", "أحمد", "مريم", "عمر", "زينب", "خالد", "نور", "يوسف", "سارة",
+    "إبراهيم", "عائشة", "محمود", "ليلى", "حسن", "رقية", "علي", "سمية", "مصطفى", "هدى",
+    "بشرى", "سلمى", "عبدالرحمن", "أسماء", "طارق", "نادية", "فيصل", "منى", "سعيد", "جميلة"
+]
+
+def plain_text(text):
+    return text
+
+def set_language(arabic):
+    # Switches the headers, day names, default names and text shaping
+    # between English and Arabic; falls back to English when the Arabic
+    # libraries are missing. Returns the language actually set.
+    global USE_ARABIC, HEADERS, DAYS_ARABIC, DEFAULT_NAMES, reshape_arabic
+    if arabic:
+        # Requires: pip install arabic-reshaper python-bidi
+        try:
+            import arabic_reshaper
+            from bidi.algorithm import get_display
+
+            def reshape_arabic(text):
+                shaped = shaping_cache.get(text)
+                if shaped is None:
+                    reshaped = get_reshaper()[0].reshape(text)
+                    shaped = shaping_cache[text] = get_display(reshaped)
+                return shaped
+
+            USE_ARABIC, HEADERS, DAYS_ARABIC, DEFAULT_NAMES = True, ARABIC_HEADERS, ARABIC_DAYS, ARABIC_NAMES
+            return USE_ARABIC
+        except ImportError:
+            print("⚠️ Arabic libraries not found. Install: pip install arabic-reshaper python-bidi")
+    USE_ARABIC, HEADERS, DAYS_ARABIC, DEFAULT_NAMES = False, ENGLISH_HEADERS, {}, ENGLISH_NAMES
+    reshape_arabic = plain_text
+    return USE_ARABIC
+
+set_language(USE_ARABIC)
+
+# ========================================
+# HELPERS
+def read_names(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+def load_names():
+    if os.path.exists(names_file):
+        return read_names(names_file)
+    return DEFAULT_NAMES.copy()
+
+def save_names(names_list, effective_date=START_DATE):
+    # names_list is the part order on effective_date and becomes the roster
+    # version from that date on, unless that is the order already in effect.
+    # Raises ValueError for an empty list or empty names.
+    if not names_list or not all(name.strip() for name in names_list):
+        raise ValueError("the roster needs at least one name and no empty names")
+    store = get_roster_store()
+    if list(names_on(store, effective_date)) != list(names_list):
+        store.save_version(names_list, effective_date)
+    write_names_file(store)
+
+def remove_names(effective_date):
+    # Drops the roster version starting on effective_date; returns whether there was one
+    store = get_roster_store()
+    removed = store.remove_version(effective_date)
+    write_names_file(store)
+    return removed
+
+def write_names_file(store):
+    # names.txt holds today's roster in its order at START_DATE, for tools
+    # that only read names.txt. Write a temp file and rename it over
+    # names.txt, so a crash mid-write leaves the previous roster instead of
+    # a truncated one.
+    today = datetime.combine(datetime.now().date(), datetime.min.time())
+    tmp_file = names_file + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        for name in unrotate_list(names_on(store, today), days_since_start(START_DATE, today)):
+            f.write(name + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, names_file)
+
+class NamesSaver:
+    # Coalesces roster edits: save() only records the latest list and
+    # restarts a timer; the write happens on the timer thread once edits
+    # pause for `delay` seconds. flush() writes anything pending right away.
+    def __init__(self, delay=NAMES_SAVE_DELAY):
+        self.delay = delay
+        self.pending = None
+        self.timer = None
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+
+    def save(self, names_list, effective_date=START_DATE):
+        with self.lock:
+            self.pending = (list(names_list), effective_date)
+            if self.timer is not None:
+                self.timer.cancel()
+            self.timer = threading.Timer(self.delay, self.flush)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def flush(self):
+        # Writes are serialized so an older list can never land after a newer one
+        with self.write_lock:
+            with self.lock:
+                pending, self.pending = self.pending, None
+                if self.timer is not None:
+                    self.timer.cancel()
+                    self.timer = None
+            if pending is not None:
+                try:
+                    save_names(*pending)
+                except (OSError, ValueError, sqlite3.Error) as e:
+                    print(f"⚠️ Could not save names: {e}")
+
+# ========================================
+# ROSTER VERSIONS
+# Every function taking `names` for a date range also takes a RosterStore
+# (see Rotating_List_roster.py): each day then uses the version in effect on
+# it, rotated from that version's effective date instead of roster_start.
+_roster_stores = {}
+
+def get_roster_store():
+    # The store in roster_db_file, opened once per process. A new store
+    # starts with names.txt (or the default names, when it is missing or
+    # empty) in effect from START_DATE; it is kept once that is saved.
+    store = _roster_stores.get(roster_db_file)
+    if store is None:
+        store = RosterStore(roster_db_file)
+        try:
+            if store.is_empty():
+                store.save_version(load_names() or DEFAULT_NAMES.copy(), START_DATE)
+        except Exception:
+            store.close()
+            raise
+        _roster_stores[roster_db_file] = store
+    return store
+
+def roster_on(names, date, roster_start=START_DATE):
+    # (names, roster start) in effect on date
+    if isinstance(names, RosterStore):
+        return names.roster_on(date)
+    return names, roster_start
+
+def names_on(names, date, roster_start=START_DATE):
+    # The roster in part order on date
+    names, roster_start = roster_on(names, date, roster_start)
+    return rotate_list(names, days_since_start(roster_start, date))
+
+def roster_segments(names, start_date, end_date, roster_start=START_DATE):
+    # [(first day, last day, names, roster start)] covering the range
+    if isinstance(names, RosterStore):
+        return names.segments(start_date, end_date)
+    return [(start_date, end_date, names, roster_start)]
+
+def roster_schedule(names, start_date, end_date, roster_start=START_DATE):
+    # (names, roster start, rotation offset) of every day in the range
+    days = []
+    for first, last, segment_names, segment_start in roster_segments(names, start_date, end_date, roster_start):
+        offsets = rotation_offsets(segment_start, len(segment_names), first, last)
+        days += [(segment_names, segment_start, offset) for offset in offsets]
+    return days
+
+def roster_names(names, start_date, end_date, roster_start=START_DATE):
+    # Every name used in the range, for shaping
+    return [name for segment in roster_segments(names, start_date, end_date, roster_start) for name in segment[2]]
+
+def days_since_start(start_date, current_date):
+    delta = current_date.date() - start_date.date()
+    return delta.days if delta.days >= 0 else 0
+
+class RotatedList(Sequence):
+    # Read-only view of lst rotated right by n: item i is lst[i - n], wrapping
+    # around. Indexing is O(1) and nothing is copied, however large the roster.
+    __slots__ = ("items", "offset")
+
+    def __init__(self, items, offset):
+        if isinstance(items, RotatedList):
+            items, offset = items.items, items.offset + offset
+        self.items = items
+        self.offset = offset % len(items) if items else 0
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self.items)))]
+        size = len(self.items)
+        if not -size <= index < size:
+            raise IndexError("rotated list index out of range")
+        return self.items[(index - self.offset) % size]
+
+    def __iter__(self):
+        items, start = self.items, len(self.items) - self.offset
+        for i in range(start, len(items)):
+            yield items[i]
+        for i in range(start):
+            yield items[i]
+
+    def __eq__(self, other):
+        if isinstance(other, (RotatedList, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return f"RotatedList({list(self)!r})"
+
+def rotate_list(lst, n):
+    return RotatedList(lst, n)
+
+def unrotate_list(lst, n):
+    # The roster a rotated list was made from, as a plain list
+    return list(RotatedList(lst, -n))
+
+def page_chunks(names):
+    # The names on each page: PARTS_PER_PAGE per page, the last page may be short
+    return [names[i:i + PARTS_PER_PAGE] for i in range(0, len(names), PARTS_PER_PAGE)]
+
+def hex_to_rgb(hex_color):
+    hex_color = (hex_color or "#000000").lstrip("#")
+    return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+
+def get_day_name(date):
+    day_english = date.strftime("%A")
+    return DAYS_ARABIC.get(day_english, day_english)
+
+def format_size(total_bytes, pages):
+    # "1.2 MB · 6.4 KB/page" for output reports
+    text = f"{total_bytes / 1e6:.1f} MB" if total_bytes >= 1e6 else f"{total_bytes / 1e3:.1f} KB"
+    if pages:
+        text += f" · {total_bytes / pages / 1e3:.1f} KB/page"
+    return text
+
+def format_progress(done, total, elapsed):
+    # "120/365 days · 4.1 days/s · ETA 1:00" for progress displays
+    rate = done / elapsed if elapsed > 0 else 0
+    text = f"{done}/{total} days · {rate:.1f} days/s"
+    if rate and done < total:
+        minutes, seconds = divmod(int((total - done) / rate), 60)
+        text += f" · ETA {minutes}:{seconds:02d}"
+    return text
+
+# ========================================
+# SHAPING CACHE
+# Arabic mode shapes the same names and headers for every page. Shaped text is
+# kept per raw string and saved next to names.txt, so a warm run never calls
+# arabic_reshaper or bidi. A renamed person is simply a new key; entries not
+# used by the latest run are dropped when the cache is saved.
+shaping_cache = {}
+
+def shaping_cache_version():
+    try:
+        libraries = f"arabic-reshaper {version('arabic-reshaper')}, python-bidi {version('python-bidi')}"
+    except PackageNotFoundError:
+        return "unknown"
+    try:
+        disabled = get_reshaper()[1]
+    except (OSError, ValueError):
+        return "unknown"  # No font to shape for yet
+    return libraries + "".join(f", no {name}" for name in disabled)
+
+_reshapers = {}
+
+def get_reshaper():
+    # (arabic_reshaper, names of the ligatures turned off) for the current
+    # fonts. A ligature the font has no glyph for, like "Allah" (U+FDF2) in
+    # DejaVu Sans, would be dropped by FPDF and the direct writer, taking
+    # "الله" out of "عبدالله"; those words are shaped letter by letter instead.
+    files = font_files()
+    entry = _reshapers.get(files)
+    if entry is None:
+        import arabic_reshaper
+        from arabic_reshaper.ligatures import LIGATURES
+        glyph_sets = [get_cached_font(path)[0].glyph_ids for path in dict.fromkeys(files)]
+        defaults = arabic_reshaper.ArabicReshaper().configuration
+        disabled = [name for name, (_, forms) in LIGATURES if defaults.getboolean(name)
+                    and any(ord(form) not in glyphs for glyphs in glyph_sets for form in forms if form)]
+        if _reshapers:
+            shaping_cache.clear()  # Shaped for other fonts
+        entry = _reshapers[files] = (arabic_reshaper.ArabicReshaper({name: False for name in disabled}),
+                                     disabled)
+    return entry
+
+def load_shaping_cache():
+    if not USE_ARABIC or not os.path.exists(shaping_cache_file):
+        return
+    try:
+        with open(shaping_cache_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return
+    if data.get("version") == shaping_cache_version():
+        shaping_cache.update(data.get("shaped", {}))
+
+def save_shaping_cache(texts):
+    if not USE_ARABIC:
+        return
+    data = {"version": shaping_cache_version(),
+            "shaped": {text: shaping_cache[text] for text in texts if text in shaping_cache}}
+    tmp_file = shaping_cache_file + ".tmp"
+    try:
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=0)
+        os.replace(tmp_file, shaping_cache_file)
+    except OSError:
+        pass  # The cache only saves time; generation doesn't depend on it
+
+def shape_texts(texts):
+    # Batch form of reshape_arabic, e.g. for a whole roster
+    return [reshape_arabic(text) for text in texts]
+
+def range_texts(names, start_date, end_date):
+    # Every string a date range shapes: headers, names and the date headers
+    headers = [f"{d.strftime('%Y/%m/%d')} {get_day_name(d)}" for d in date_range(start_date, end_date)]
+    return list(HEADERS) + list(names) + headers
+
+load_shaping_cache()
+
+# ========================================
+# FONT CACHE
+# Parsed fonts keyed by file path, one cache per process. Pool workers
+# inherit a warm cache on fork and fill their own on first use on spawn.
+_font_cache = {}
+
+def get_cached_font(font_path):
+    font_path = str(font_path)
+    cached = _font_cache.get(font_path)
+    if cached is None:
+        with open(font_path, "rb") as f:
+            font_bytes = f.read()
+        # The template is never output, so its metrics, cmap and glyph ids
+        # stay untouched and can be shared by every document.
+        template = TTFFont(FPDF(), Path(font_path), "template", "")
+        cached = _font_cache[font_path] = (template, font_bytes)
+    return cached
+
+class UnhintedTTFont(ttLib.TTFont):
+    # fpdf subsets the font with its hinting kept; for SMALL_OUTPUT the subset
+    # drops the hinting programs and glyph instructions right before it is
+    # embedded. PDF viewers scale the outlines themselves, and hinting is
+    # often half of the embedded bytes. Glyph ids are kept, fpdf has already
+    # mapped the text to them.
+    def save(self, file, *args, **kwargs):
+        options = ftsubset.Options(hinting=False, retain_gids=True, notdef_outline=True,
+                                   recommended_glyphs=True)
+        subsetter = ftsubset.Subsetter(options)
+        subsetter.populate(glyphs=self.getGlyphOrder())
+        subsetter.subset(self)
+        return super().save(file, *args, **kwargs)
+
+# With FONT_PATH unset, the faces come from an index of the installed fonts
+# (see Rotating_List_fonts.py): scanned once, then read from font_index.json.
+_font_files = {}
+
+def font_files():
+    # (regular, bold) font files for the active language
+    if FONT_PATH:
+        return FONT_PATH, FONT_PATH
+    key = (USE_ARABIC, font_index_file)
+    files = _font_files.get(key)
+    if files is None:
+        files = _font_files[key] = find_font_files(load_font_index(font_index_file), USE_ARABIC)
+    return files
+
+def clone_cached_font(pdf, family, style, font_path):
+    template, font_bytes = get_cached_font(font_path)
+    fontkey = f"{family.lower()}{style}"
+    font = copy.copy(template)
+    font.i = len(pdf.fonts) + 1
+    font.fontkey = fontkey
+    font.emphasis = type(template.emphasis).coerce(style)
+    # The descriptor becomes a numbered PDF object, so it can't be shared
+    font.desc = copy.copy(template.desc)
+    # Subsetting on output rewrites the fontTools object in place, so each
+    # document gets its own lazily loaded copy of the raw bytes.
+    font_class = UnhintedTTFont if SMALL_OUTPUT else ttLib.TTFont
+    font.ttfont = font_class(BytesIO(font_bytes), recalcTimestamp=False, lazy=True)
+    font._hbfont = None
+    font.missing_glyphs = []
+    font.biggest_size_pt = 0
+    font.subset = SubsetMap(font)
+    pdf.fonts[fontkey] = font
+
+# ========================================
+# STAGE PROFILING
+# With PROFILE_STAGES on, every day records the wall time and peak Python
+# memory (tracemalloc) of each stage: font (PDF.__init__ and font loading),
+# shaping, layout (cells, cached table bodies), output (pdf.output, which
+# subsets the font) and write (the file or archive member). A run adds the
+# days up in a profile dict as they finish, so a GUI can show the breakdown
+# live, and saves it as profile.json next to its output. Tracing slows
+# generation down, so it stays off unless asked for.
+STAGES = ("font", "shaping", "layout", "output", "write")
+PROFILE_FILE = "profile.json"
+_day_stages = None
+
+@contextmanager
+def stage(name):
+    if _day_stages is None:
+        yield
+        return
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1] - before
+        entry = _day_stages.setdefault(name, {"seconds": 0.0, "peak_bytes": 0})
+        entry["seconds"] += seconds
+        entry["peak_bytes"] = max(entry["peak_bytes"], peak)
+
+@contextmanager
+def profile_day():
+    # Yields the dict the stages inside it record into, None when profiling is off
+    global _day_stages
+    if not PROFILE_STAGES:
+        yield None
+        return
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _day_stages = {}
+    try:
+        yield _day_stages
+    finally:
+        _day_stages = None
+
+def shape_day(names, date):
+    # Shapes a day's texts up front while profiling, so shaping shows as its
+    # own stage rather than inside layout (which then hits the cache)
+    if _day_stages is not None:
+        with stage("shaping"):
+            shape_texts(range_texts(names, date, date))
+
+def start_profile(profile=None):
+    # The dict a run records into: the caller's, to read it live, or a new
+    # one. None when profiling is off.
+    if not PROFILE_STAGES:
+        return None
+    if profile is None:
+        profile = {}
+    profile.update({"started": time.perf_counter(), "stages": {}, "days": {}})
+    return profile
+
+def add_profile(profile, stages, date=None):
+    # Adds one day's stages, or run-wide ones without a date, to the totals
+    if profile is None or not stages:
+        return
+    day = profile["days"].setdefault(date.strftime("%Y-%m-%d"), {}) if date else None
+    for name, entry in stages.items():
+        total = profile["stages"].setdefault(name, {"seconds": 0.0, "max_seconds": 0.0, "peak_bytes": 0})
+        total["seconds"] += entry["seconds"]
+        total["max_seconds"] = max(total["max_seconds"], entry["seconds"])
+        total["peak_bytes"] = max(total["peak_bytes"], entry["peak_bytes"])
+        if day is not None:
+            day_entry = day.setdefault(name, {"seconds": 0.0, "peak_bytes": 0})
+            day_entry["seconds"] += entry["seconds"]
+            day_entry["peak_bytes"] = max(day_entry["peak_bytes"], entry["peak_bytes"])
+
+def format_profile(profile):
+    # "font 3% · shaping 1% · layout 20% · output 70% · write 6% · peak 4.2 MB"
+    stages = profile.get("stages") if profile else None
+    if not stages:
+        return ""
+    total = sum(entry["seconds"] for entry in stages.values()) or 1
+    parts = [f"{name} {stages[name]['seconds'] / total:.0%}" for name in STAGES if name in stages]
+    peak = max(entry["peak_bytes"] for entry in stages.values())
+    return " · ".join(parts) + f" · peak {peak / 1e6:.1f} MB"
+
+def finish_profile(profile, output_folder):
+    # Saves the run as profile.json in output_folder; returns its path. With
+    # several workers the stage times add up to more than the wall time.
+    if profile is None:
+        return None
+    stages = profile["stages"]
+    summary = {
+        "wall_seconds": round(time.perf_counter() - profile["started"], 6),
+        "days": len(profile["days"]),
+        "stages": {name: stages[name] for name in STAGES if name in stages},
+        "per_day": dict(sorted(profile["days"].items())),
+    }
+    path = os.path.join(output_folder, PROFILE_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=1)
+    os.replace(tmp_path, path)
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+    return path
+
+# ========================================
+# PDF GENERATION
+class PDF(StatePDF):
+    # Colors, font and line width are only set when they change (see
+    # Rotating_List_drawing.py). The Arial faces are registered from font_files() when first used:
+    # every registered face is embedded, and an unused one still costs its
+    # own font program, widths and ToUnicode map in every file.
+    # "Arial" is only the name the drawing code uses, not the font file.
+    def add_font(self, family=None, style="", fname=None, uni=None, **kwargs):
+        # Same call as FPDF.add_font, served from the process-wide font cache
+        if kwargs or not family or not fname:
+            return super().add_font(family, style, fname, **kwargs)
+        clone_cached_font(self, family, "".join(sorted(style.upper())), fname)
+
+    def font_face(self, style=""):
+        # The font of Arial `style` ("B", or fpdf's TextEmphasis when it
+        # restores the font on a new page), registered on first use
+        style = style if isinstance(style, str) else style.style
+        style = "".join(sorted(char for char in style.upper() if char in "BI"))
+        if f"arial{style}" not in self.fonts:
+            self.add_font('Arial', style, font_files()["B" in style], uni=True)
+        return self.fonts[f"arial{style}"]
+
+    def set_font(self, family=None, style="", size=0):
+        if family and family.lower() == "arial":
+            self.font_face(style)
+        super().set_font(family, style, size)
+
+def draw_date_header(pdf, date):
+    # Header with date and day name (black, also after a table on an earlier page)
+    pdf.set_text_color(0, 0, 0)
+    pdf.set_font("Arial", 'B', 38)
+    header_text = f"{date.strftime('%Y/%m/%d')} {get_day_name(date)}"
+    pdf.cell(0, 15, reshape_arabic(header_text), ln=1, align='C')
+    pdf.ln(5)
+
+def draw_table(pdf, names, colors):
+    # Draws the header row and the numbered rows for one page (up to
+    # PARTS_PER_PAGE names); returns the (x, y) of each name cell, indexed
+    # like names, so a page template can stamp them later.
+    # Table setup
+    col_name_w, col_num_w, row_h = 75, 20, 15
+
+    # Header row
+    header_fill_rgb = hex_to_rgb(colors.get("header_fill"))
+    header_text_rgb = hex_to_rgb(colors.get("header_text"))
+    border_rgb = hex_to_rgb(colors.get("borders"))
+
+    pdf.set_draw_color(*border_rgb)
+    pdf.set_fill_color(*header_fill_rgb)
+    pdf.set_text_color(*header_text_rgb)
+    pdf.set_line_width(1.2)
+    pdf.set_font("Arial", 'B', 16)
+
+    for header in HEADERS:
+        pdf.cell(col_num_w if "Part" in header or "رقم" in header else col_name_w,
+                row_h, reshape_arabic(header), border=1, align='C', fill=True)
+    pdf.ln()
+
+    # Data rows
+    row1_rgb = hex_to_rgb(colors.get("row_bg1"))
+    row2_rgb = hex_to_rgb(colors.get("row_bg2"))
+    text_rgb = hex_to_rgb(colors.get("text"))
+    numbers_rgb = hex_to_rgb(colors.get("numbers"))
+    names_bg_rgb = hex_to_rgb(colors.get("names_bg"))
+
+    pdf.set_draw_color(*border_rgb)
+    pdf.set_line_width(1.2)
+
+    name_cells = [None] * len(names)
+
+    for row in range(min(len(names), ROWS_PER_COLUMN)):
+        row_fill = row1_rgb if row % 2 == 0 else row2_rgb
+
+        # Left column (parts 16-30) first, then the right column (parts 1-15)
+        for index, x in ((row + ROWS_PER_COLUMN, 5), (row, 5 + col_num_w + col_name_w)):
+            if index >= len(names):
+                continue
+            pdf.set_x(x)
+
+            # Number
+            pdf.set_fill_color(*row_fill)
+            pdf.set_text_color(*numbers_rgb)
+            pdf.set_font("Arial", 'B', 28)
+            pdf.cell(col_num_w, row_h, str(index + 1), border=1, align='C', fill=True)
+
+            # Name
+            name_cells[index] = (pdf.get_x(), pdf.get_y())
+            pdf.set_fill_color(*names_bg_rgb)
+            pdf.set_text_color(*text_rgb)
+            pdf.cell(col_name_w, row_h, reshape_arabic(names[index]), border=1, align='C', fill=True)
+
+        pdf.ln()
+
+    return name_cells
+
+def render_pdf(names, date, colors):
+    # The finished PDF for one day as bytes, names already rotated for the
+    # date; nothing touches the file system
+    shape_day(names, date)
+    if USE_DIRECT_WRITER:
+        return render_pdf_direct(names, date, colors)
+    if USE_PAGE_TEMPLATE:
+        return render_pdf_from_template(names, date, colors)
+
+    with stage("font"):
+        pdf = PDF()
+    with stage("layout"):
+        pdf.set_margins(5, 5, 5)
+        for page_names in page_chunks(names):
+            pdf.add_page()
+            draw_date_header(pdf, date)
+            draw_table(pdf, page_names, colors)
+    with stage("output"):
+        return bytes(pdf.output())
+
+def write_pdf(filename, data):
+    # Written under a temp name and renamed, so a print job opening the file
+    # while it is regenerated gets the old or the new PDF, never half of one
+    temp_file = filename + ".tmp"
+    with stage("write"):
+        with open(temp_file, "wb") as f:
+            f.write(data)
+        os.replace(temp_file, filename)
+
+def generate_pdf(names, day_num, date, filename, colors):
+    write_pdf(filename, render_pdf(names, date, colors))
+
+# ========================================
+# PAGE TEMPLATES
+# The header row, cell fills, borders and part numbers only depend on the
+# colors, so they are drawn once per theme and their content stream is
+# stamped onto each day's page. The names only depend on the rotation offset,
+# so the filled-in table body of each page is cached per rotated roster as
+# well: a roster of 30 needs at most 30 bodies, and every other day only draws
+# its date header.
+TABLE_BODY_CACHE_LIMIT = 512
+_page_templates = {}
+_table_bodies = {}
+
+def static_table_texts():
+    return [reshape_arabic(header) for header in HEADERS] + [str(n) for n in range(1, PARTS_PER_PAGE + 1)]
+
+def roster_chars(names):
+    # Every character the roster needs, in an order no rotation or page split changes
+    return "".join(sorted(set("".join(reshape_arabic(name) for name in names))))
+
+def reserve_table_glyphs(pdf, chars):
+    # fpdf numbers glyphs in order of first use. Picking the static texts and
+    # then the roster's characters first in every document gives them the
+    # same codes as in the cached streams.
+    subset = pdf.font_face("B").subset
+    for text in static_table_texts() + [chars]:
+        for char in text:
+            subset.pick(ord(char))
+
+def get_page_template(colors, name_count):
+    key = (font_files(), USE_ARABIC, tuple(sorted(colors.items())), name_count)
+    template = _page_templates.get(key)
+    if template is None:
+        pdf = PDF()
+        reserve_table_glyphs(pdf, "")
+        pdf.set_margins(5, 5, 5)
+        pdf.add_page()
+        # Leave room for the date header, as draw_date_header does
+        pdf.ln(20)
+        contents = pdf.pages[pdf.page].contents
+        start = len(contents)
+        name_cells = draw_table(pdf, [""] * name_count, colors)
+        # q/Q keeps the stamped colors and line width out of fpdf's tracked state
+        stream = b"q\n" + bytes(contents[start:]) + b"Q"
+        template = _page_templates[key] = (stream, name_cells)
+    return template
+
+def get_table_body(names, colors, chars):
+    # names are one page's worth; chars is roster_chars() of the whole roster
+    key = (font_files(), USE_ARABIC, tuple(sorted(colors.items())), tuple(names), chars)
+    body = _table_bodies.get(key)
+    if body is None:
+        stream, name_cells = get_page_template(colors, len(names))
+        pdf = PDF()
+        reserve_table_glyphs(pdf, chars)
+        pdf.set_margins(5, 5, 5)
+        pdf.add_page()
+        contents = pdf.pages[pdf.page].contents
+        start = len(contents)
+        pdf._out(stream)
+        pdf.set_font("Arial", 'B', 28)
+        pdf.set_text_color(*hex_to_rgb(colors.get("text")))
+        for name, (x, y) in zip(names, name_cells):
+            pdf.set_xy(x, y)
+            pdf.cell(75, 15, reshape_arabic(name), align='C')
+        body = b"q\n" + bytes(contents[start:]) + b"Q"
+        if len(_table_bodies) >= TABLE_BODY_CACHE_LIMIT:
+            _table_bodies.clear()
+        _table_bodies[key] = body
+    return body
+
+def render_pdf_from_template(names, date, colors):
+    with stage("layout"):
+        chars = roster_chars(names)
+        bodies = [get_table_body(page_names, colors, chars) for page_names in page_chunks(names)]
+
+    with stage("font"):
+        pdf = PDF()
+        reserve_table_glyphs(pdf, chars)
+    with stage("layout"):
+        pdf.set_margins(5, 5, 5)
+        for body in bodies:
+            pdf.add_page()
+            pdf._out(body)
+            draw_date_header(pdf, date)
+    with stage("output"):
+        return bytes(pdf.output())
+
+# ========================================
+# MULTI-PAGE DOCUMENTS
+# A whole range as one PDF, one page per day, drawn with the same geometry as
+# draw_date_header/draw_table and streamed out page by page, so memory does
+# not grow with the range and the font is embedded only once.
+def rgb_op(rgb, op):
+    return " ".join(f"{c / 255:.4f}" for c in rgb) + f" {op}"
+
+def direct_text(writer, state, x, y, w, h, text, size, rgb):
+    # Centred like FPDF.cell(align='C'): baseline at mid-height + 0.3 em.
+    # Font size and color are only set when state says they changed.
+    text = reshape_arabic(text)
+    text_w = writer.string_width(text, size) / K
+    tx, ty = (x + (w - text_w) / 2) * K, PAGE_H - (y + h / 2 + 0.3 * size / K) * K
+    ops = ["BT"]
+    if state.changed("Tf", size):
+        ops.append(f"/F1 {size:.2f} Tf")
+    ops.append(f"{tx:.2f} {ty:.2f} Td")
+    if state.changed("rg", rgb):
+        ops.append(rgb_op(rgb, "rg"))
+    ops.append(f"{writer.encode_text(text)} Tj ET")
+    return " ".join(ops)
+
+def direct_box(state, x, y, w, h, fill_rgb):
+    box = f"{x * K:.2f} {PAGE_H - y * K:.2f} {w * K:.2f} {-h * K:.2f} re B"
+    return f"{rgb_op(fill_rgb, 'rg')} {box}" if state.changed("rg", fill_rgb) else box
+
+def table_name_cells(name_count):
+    # (x, y) of each name cell on a page, indexed like names (see draw_table)
+    return [(120 if index < ROWS_PER_COLUMN else 25, 25 + 15 * (index % ROWS_PER_COLUMN + 1))
+            for index in range(name_count)]
+
+def direct_table_skeleton(writer, colors, name_count):
+    # Returns (operators, GraphicsState at their end) for direct_table_body
+    col_name_w, col_num_w, row_h = 75, 20, 15
+    header_fill_rgb = hex_to_rgb(colors.get("header_fill"))
+    header_text_rgb = hex_to_rgb(colors.get("header_text"))
+    row1_rgb = hex_to_rgb(colors.get("row_bg1"))
+    row2_rgb = hex_to_rgb(colors.get("row_bg2"))
+    numbers_rgb = hex_to_rgb(colors.get("numbers"))
+    names_bg_rgb = hex_to_rgb(colors.get("names_bg"))
+
+    state = GraphicsState()
+    ops = ["2 J", f"{1.2 * K:.2f} w", rgb_op(hex_to_rgb(colors.get("borders")), "RG")]
+    x = 5
+    for header in HEADERS:
+        w = col_num_w if "Part" in header or "رقم" in header else col_name_w
+        ops.append(direct_box(state, x, 25, w, row_h, header_fill_rgb))
+        ops.append(direct_text(writer, state, x, 25, w, row_h, header, 16, header_text_rgb))
+        x += w
+
+    for row in range(min(name_count, ROWS_PER_COLUMN)):
+        y = 25 + row_h * (row + 1)
+        row_fill = row1_rgb if row % 2 == 0 else row2_rgb
+        for index, x in ((row + ROWS_PER_COLUMN, 5), (row, 100)):
+            if index >= name_count:
+                continue
+            ops.append(direct_box(state, x, y, col_num_w, row_h, row_fill))
+            ops.append(direct_text(writer, state, x, y, col_num_w, row_h, str(index + 1), 28, numbers_rgb))
+            ops.append(direct_box(state, x + col_num_w, y, col_name_w, row_h, names_bg_rgb))
+    return "\n".join(ops), state
+
+def direct_table_body(writer, skeleton, name_cells, names, colors):
+    text_rgb = hex_to_rgb(colors.get("text"))
+    ops, state = skeleton
+    ops, state = [ops], state.copy()
+    for name, (x, y) in zip(names, name_cells):
+        ops.append(direct_text(writer, state, x, y, 75, 15, name, 28, text_rgb))
+    return "\n".join(ops).encode("latin1")
+
+def direct_date_header(writer, date):
+    header_text = f"{date.strftime('%Y/%m/%d')} {get_day_name(date)}"
+    # Drawn after the table's Q, where none of its state is in effect
+    return direct_text(writer, GraphicsState(), 5, 5, 200, 15, header_text, 38, (0, 0, 0))
+
+def direct_page_content(writer, body_form, date):
+    ops = [f"q /{body_form} Do Q", direct_date_header(writer, date)]
+    return "\n".join(ops).encode("latin1")
+
+def document_filename(start_date, end_date):
+    return f"{start_date.strftime('%Y-%m-%d')}_to_{end_date.strftime('%Y-%m-%d')}.pdf"
+
+def write_pdf_document(f, names, start_date, end_date, colors, progress=None, cancel=None,
+                       roster_start=START_DATE, profile=None):
+    # Streams the document into the binary file object f. Returns the number
+    # of pages, or 0 when cancelled before the last day (f then holds an
+    # unfinished document). progress(done, total) is called after each day;
+    # setting the cancel event stops after the current day. Stage times go
+    # into profile (see start_profile).
+    with profile_day() as stages, stage("font"):
+        font, font_bytes = get_cached_font(font_files()[1])
+        writer = StreamingPDFWriter(f, font, font_bytes, hinting=not SMALL_OUTPUT)
+    add_profile(profile, stages)
+    total = (end_date.date() - start_date.date()).days + 1
+    # One skeleton per page size: full pages and a shorter last page
+    skeletons = {}
+    # The table only depends on the roster version and rotation offset, so a
+    # roster of 30 gives at most 30 distinct bodies; each is written once as a form
+    # and every later page with that offset only adds its date header.
+    body_forms = {}
+    days = pages = 0
+    schedule = roster_schedule(names, start_date, end_date, roster_start)
+    for date, (day_names, day_start, offset) in zip(date_range(start_date, end_date), schedule):
+        rotated = rotate_list(day_names, offset)
+        with profile_day() as stages:
+            shape_day(rotated, date)
+            for page, start in enumerate(range(0, len(day_names), PARTS_PER_PAGE)):
+                key = (day_start, rotated.offset, page)
+                with stage("layout"):
+                    if key not in body_forms:
+                        page_names = rotated[start:start + PARTS_PER_PAGE]
+                        count = len(page_names)
+                        if count not in skeletons:
+                            skeletons[count] = direct_table_skeleton(writer, colors, count)
+                        body = direct_table_body(writer, skeletons[count], table_name_cells(count), page_names, colors)
+                        body_forms[key] = writer.add_form(body)
+                    content = direct_page_content(writer, body_forms[key], date)
+                with stage("write"):
+                    writer.add_page(content)
+                pages += 1
+        add_profile(profile, stages, date)
+        days += 1
+        if progress:
+            progress(days, total)
+        if cancel is not None and cancel.is_set() and days < total:
+            return 0
+    # Closing subsets and embeds the font and writes the cross-reference table
+    with profile_day() as stages, stage("output"):
+        writer.close()
+    add_profile(profile, stages)
+    return pages
+
+def render_pdf_document(names, start_date, end_date, colors, roster_start=START_DATE):
+    # The whole range as one PDF in memory, returned as a memoryview of the
+    # buffer it was written to, so a large document is never copied
+    buffer = BytesIO()
+    write_pdf_document(buffer, names, start_date, end_date, colors, roster_start=roster_start)
+    return buffer.getbuffer()
+
+def generate_pdf_document(names, start_date, end_date, filename, colors, progress=None, cancel=None,
+                          roster_start=START_DATE, profile=None):
+    # Returns the number of pages written; a cancelled run removes the
+    # unfinished file (returns 0). With PROFILE_STAGES, profile.json is saved
+    # next to the file.
+    profile = start_profile(profile)
+    with open(filename, "wb") as f:
+        pages = write_pdf_document(f, names, start_date, end_date, colors, progress, cancel, roster_start,
+                                   profile)
+    if not pages:
+        os.remove(filename)
+    elif profile is not None:
+        finish_profile(profile, os.path.dirname(os.path.abspath(filename)))
+    return pages
+
+# ========================================
+# DIRECT DAILY PDFS
+# The daily PDFs drawn like the document pages above, straight into a page
+# content stream instead of through FPDF's cells. Every file of a run reserves
+# the same glyphs (table, roster, digits and day names), so a table body drawn
+# for one rotated roster is reused by later files, and the writer subsets the
+# font once per run instead of once per file.
+DIRECT_BODY_CACHE_LIMIT = 512
+_direct_bodies = {}
+
+def date_header_chars():
+    # Every character a date header can use, whatever the date
+    weekdays = [reshape_arabic(get_day_name(START_DATE + timedelta(days=day))) for day in range(7)]
+    return "0123456789/ " + "".join(weekdays)
+
+def get_direct_body(writer, names, colors):
+    # One page's table as operators, wrapped in q/Q like the page templates
+    key = (font_files()[1], USE_ARABIC, tuple(sorted(colors.items())), tuple(names))
+    body = _direct_bodies.get(key)
+    if body is None:
+        skeleton = direct_table_skeleton(writer, colors, len(names))
+        body = b"q\n" + direct_table_body(writer, skeleton, table_name_cells(len(names)), names, colors) + b"\nQ"
+        if len(_direct_bodies) >= DIRECT_BODY_CACHE_LIMIT:
+            _direct_bodies.clear()
+        _direct_bodies[key] = body
+    return body
+
+def render_pdf_direct(names, date, colors):
+    buffer = BytesIO()
+    with stage("font"):
+        font, font_bytes = get_cached_font(font_files()[1])
+        writer = StreamingPDFWriter(buffer, font, font_bytes, hinting=not SMALL_OUTPUT)
+        writer.reserve_text("".join(static_table_texts()) + roster_chars(names) + date_header_chars())
+    with stage("layout"):
+        for page_names in page_chunks(names):
+            body = get_direct_body(writer, page_names, colors)
+            writer.add_page(body + b"\n" + direct_date_header(writer, date).encode("latin1"))
+    with stage("output"):
+        writer.close()
+    return buffer.getvalue()
+
+# ========================================
+# BUILD MANIFEST
+# manifest.json in the output folder maps each MM-DD.pdf to a hash of what
+# went into it: date, rotated names, colors, language, font file and renderer
+# version. A day whose hash is unchanged and whose file exists is not rebuilt.
+MANIFEST_VERSION = 2  # Bump when a code change alters the rendered pages
+
+def manifest_path(output_folder):
+    return os.path.join(output_folder, "manifest.json")
+
+def load_manifest(output_folder):
+    try:
+        with open(manifest_path(output_folder), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != MANIFEST_VERSION:
+        return {}
+    return data.get("files", {})
+
+def save_manifest(output_folder, manifest):
+    path = manifest_path(output_folder)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": MANIFEST_VERSION, "files": dict(sorted(manifest.items()))}, f, indent=1)
+    os.replace(tmp_path, path)
+
+def font_identity():
+    identity = []
+    for path in dict.fromkeys(font_files()):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            identity.append([path])
+            continue
+        identity.append([path, stat.st_size, stat.st_mtime_ns])
+    return identity
+
+def day_input_hash(rotated_names, date, colors, font_id):
+    inputs = {
+        "date": date.strftime("%Y-%m-%d"),
+        "names": list(rotated_names),
+        "colors": sorted(colors.items()),
+        "arabic": USE_ARABIC,
+        "headers": HEADERS,
+        "small": SMALL_OUTPUT,
+        "font": font_id,
+    }
+    return hashlib.sha256(json.dumps(inputs, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+# ========================================
+# DATE RANGE GENERATION
+def date_range(start_date, end_date):
+    current = start_date
+    while current <= end_date:
+        yield current
+        current += timedelta(days=1)
+
+def day_filename(date):
+    return f"{date.strftime('%m-%d')}.pdf"
+
+def rotation_offsets(roster_start, size, start_date, end_date):
+    # Rotation offset of every day in the range in one pass: 0 until the
+    # roster starts, then one step a day, wrapping at the roster size
+    first = (start_date.date() - roster_start.date()).days
+    total = (end_date.date() - start_date.date()).days + 1
+    return [max(first + day, 0) % size for day in range(total)]
+
+def generate_day(names, date, output_folder, colors, roster_start=START_DATE):
+    # Renders one MM-DD.pdf; returns (date, filename, error, stages). Errors
+    # are returned instead of raised so a bad day never stops the rest of
+    # the range; stages is None unless PROFILE_STAGES is on.
+    filename = os.path.join(output_folder, day_filename(date))
+    with profile_day() as stages:
+        try:
+            day_num = days_since_start(roster_start, date)
+            generate_pdf(rotate_list(names, day_num), day_num, date, filename, colors)
+        except Exception as e:
+            return date, filename, f"{type(e).__name__}: {e}", stages
+    return date, filename, None, stages
+
+def render_day(names, date, colors, roster_start=START_DATE):
+    # generate_day without a file: returns (date, pdf bytes, error, stages)
+    with profile_day() as stages:
+        try:
+            day_num = days_since_start(roster_start, date)
+            data = render_pdf(rotate_list(names, day_num), date, colors)
+        except Exception as e:
+            return date, None, f"{type(e).__name__}: {e}", stages
+    return date, data, None, stages
+
+def init_worker(config):
+    # Spawned workers re-import this module with its defaults; carry over
+    # settings the caller changed at runtime (e.g. the CLI's --font)
+    globals().update(config)
+    set_language(USE_ARABIC)
+    load_shaping_cache()
+
+def worker_config():
+    return {"FONT_PATH": FONT_PATH, "USE_DIRECT_WRITER": USE_DIRECT_WRITER, "USE_PAGE_TEMPLATE": USE_PAGE_TEMPLATE,
+            "USE_ARABIC": USE_ARABIC, "PROFILE_STAGES": PROFILE_STAGES, "SMALL_OUTPUT": SMALL_OUTPUT,
+            "shaping_cache_file": shaping_cache_file, "font_index_file": font_index_file}
+
+def plan_range(names, start_date, end_date, output_folder, colors, roster_start=START_DATE, force=False,
+               offsets=None):
+    # Returns (jobs, hashes, skipped): generate_day arguments for the days
+    # that need building, the manifest entries they get once written, and
+    # how many days the manifest marks as unchanged (ignored with force).
+    # offsets may be passed in when already computed (see rotation_offsets).
+    # A later date overwrites an earlier one with the same MM-DD name
+    days = {}
+    for date in date_range(start_date, end_date):
+        days[day_filename(date)] = date
+    if offsets is None:
+        schedule = roster_schedule(names, start_date, end_date, roster_start)
+    else:
+        schedule = [(names, roster_start, offset) for offset in offsets]
+
+    manifest = load_manifest(output_folder)
+    font_id = font_identity()
+    hashes, jobs = {}, []
+    for filename, date in days.items():
+        day_names, day_start, offset = schedule[(date.date() - start_date.date()).days]
+        rotated = rotate_list(day_names, offset)
+        hashes[filename] = day_input_hash(rotated, date, colors, font_id)
+        up_to_date = (manifest.get(filename) == hashes[filename]
+                      and os.path.exists(os.path.join(output_folder, filename)))
+        if force or not up_to_date:
+            jobs.append((day_names, date, output_folder, colors, day_start))
+    return jobs, hashes, len(days) - len(jobs)
+
+def prepare_shaping(texts, profile=None):
+    # Shape everything once up front; workers inherit or reload the cache
+    if not USE_ARABIC:
+        return
+    with profile_day() as stages:
+        with stage("shaping"):
+            known = len(shaping_cache)
+            shape_texts(texts)
+        if len(shaping_cache) != known or not os.path.exists(shaping_cache_file):
+            save_shaping_cache(texts)
+    add_profile(profile, stages)
+
+def iter_days(jobs, task=generate_day, workers=PDF_WORKERS, cancel=None):
+    # Yields task(*job) for each job as it finishes. Each day is independent,
+    # so days are spread across a process pool and come back in completion
+    # order; the file name only depends on the date, so the output is the
+    # same whichever worker renders it. Setting the cancel event lets days
+    # already being rendered finish and drops the rest.
+    if not jobs:
+        return
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1:
+        for job in jobs:
+            if cancel is not None and cancel.is_set():
+                return
+            yield task(*job)
+        return
+
+    yielded = set()
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(worker_config(),)) as executor:
+        futures = [executor.submit(task, *job) for job in jobs]
+        for future in as_completed(futures):
+            yielded.add(future)
+            yield future.result()
+            if cancel is not None and cancel.is_set():
+                for pending in futures:
+                    pending.cancel()
+                break
+    # Leaving the pool waits for running days, so they still count
+    for future in futures:
+        if future not in yielded and not future.cancelled():
+            yield future.result()
+
+def run_days(jobs, workers=PDF_WORKERS, progress=None, cancel=None, profile=None):
+    # Renders plan_range jobs, from any number of rosters and folders, and
+    # returns generate_day results in date order. progress(done, total) is
+    # called as days finish, after their stages are added to profile; see
+    # iter_days for cancel.
+    results = []
+    for result in iter_days(jobs, generate_day, workers, cancel):
+        results.append(result)
+        add_profile(profile, result[3], result[0])
+        if progress:
+            progress(len(results), len(jobs))
+    results.sort(key=lambda result: result[0])
+    return results
+
+def record_results(output_folder, hashes, results):
+    # Stores the hashes of the days written to output_folder; returns
+    # (generated, failures) where failures is a list of (date, error)
+    manifest = load_manifest(output_folder)
+    for date, filename, error, _ in results:
+        name = os.path.basename(filename)
+        if error:
+            manifest.pop(name, None)
+        else:
+            manifest[name] = hashes[name]
+    save_manifest(output_folder, manifest)
+
+    failures = [(date, error) for date, _, error, _ in results if error]
+    return len(results) - len(failures), failures
+
+def generate_pdf_range(names, start_date, end_date, output_folder, colors, workers=PDF_WORKERS, force=False,
+                       progress=None, cancel=None, roster_start=START_DATE, profile=None):
+    # Returns (generated, skipped, failures) where failures is a list of
+    # (date, error) in date order. Days whose inputs match the build manifest
+    # are skipped unless force is set; see run_days for progress, cancel and
+    # profile. With PROFILE_STAGES, profile.json is saved in output_folder.
+    jobs, hashes, skipped = plan_range(names, start_date, end_date, output_folder, colors,
+                                       roster_start=roster_start, force=force)
+    if not jobs:
+        return 0, skipped, []
+    profile = start_profile(profile)
+    prepare_shaping(range_texts(roster_names(names, start_date, end_date, roster_start), start_date, end_date),
+                    profile)
+    results = run_days(jobs, workers, progress, cancel, profile)
+    generated, failures = record_results(output_folder, hashes, results)
+    finish_profile(profile, output_folder)
+    return generated, skipped, failures
+
+# ========================================
+# ZIP ARCHIVES
+# A whole range as one ZIP: each day's PDF goes from the worker that rendered
+# it straight into the archive, so no loose files are staged on disk, and
+# index.json maps every date to its member. One file copies and syncs much
+# faster than hundreds of small ones.
+def archive_filename(start_date, end_date):
+    return f"{start_date.strftime('%Y-%m-%d')}_to_{end_date.strftime('%Y-%m-%d')}.zip"
+
+def archive_member(date):
+    # Full dates, so ranges longer than a year don't collide like MM-DD.pdf
+    return f"{date.strftime('%Y-%m-%d')}.pdf"
+
+def generate_pdf_archive(names, start_date, end_date, filename, colors, workers=PDF_WORKERS,
+                         progress=None, cancel=None, roster_start=START_DATE, profile=None):
+    # Returns (written, failures) like generate_pdf_range. The archive is
+    # built under a temp name and renamed when complete; on cancel it is
+    # removed instead (returns 0, []). With PROFILE_STAGES, profile.json is
+    # saved next to the archive.
+    schedule = roster_schedule(names, start_date, end_date, roster_start)
+    jobs = [(day_names, date, colors, day_start)
+            for date, (day_names, day_start, _) in zip(date_range(start_date, end_date), schedule)]
+    profile = start_profile(profile)
+    prepare_shaping(range_texts(roster_names(names, start_date, end_date, roster_start), start_date, end_date),
+                    profile)
+    index, failures = {}, []
+    tmp_file = filename + ".tmp"
+    # The PDFs are compressed inside, but deflating them still saves about a sixth
+    with zipfile.ZipFile(tmp_file, "w", zipfile.ZIP_DEFLATED) as archive:
+        for done, (date, data, error, stages) in enumerate(iter_days(jobs, render_day, workers, cancel), 1):
+            add_profile(profile, stages, date)
+            if error:
+                failures.append((date, error))
+            else:
+                member = archive_member(date)
+                with profile_day() as stages, stage("write"):
+                    archive.writestr(member, data)
+                add_profile(profile, stages, date)
+                index[date.strftime("%Y-%m-%d")] = {"file": member, "weekday": get_day_name(date),
+                                                    "day": days_since_start(roster_start, date)}
+            if progress:
+                progress(done, len(jobs))
+        archive.writestr("index.json", json.dumps(
+            {"start": start_date.strftime("%Y-%m-%d"), "end": end_date.strftime("%Y-%m-%d"),
+             "days": dict(sorted(index.items()))}, ensure_ascii=False, indent=1))
+    if len(index) + len(failures) < len(jobs):
+        os.remove(tmp_file)
+        return 0, []
+    os.replace(tmp_file, filename)
+    finish_profile(profile, os.path.dirname(os.path.abspath(filename)))
+    failures.sort(key=lambda failure: failure[0])
+    return len(index), failures
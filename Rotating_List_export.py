@@ -0,0 +1,98 @@
+"""
+Quran Parts PDF Generator - schedule export
+Writes the raw schedule for a date range as data instead of PDFs: one row per
+day (and group), one column per part, as CSV or Parquet. Nothing is rendered,
+so multi-year schedules of large rosters export in seconds.
+"""
+
+import csv
+import os
+
+import Rotating_List_engine as engine
+
+# Optional: NumPy speeds up building the matrix, pyarrow is needed for Parquet
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# ========================================
+# SCHEDULE MATRIX
+def schedule_matrix(names, offsets):
+    # Row d holds the names in part order for rotation offset offsets[d]:
+    # part p goes to names[(p - offset) % size]. The whole index matrix is
+    # built at once and gathered in one step, not rotated day by day.
+    size = len(names)
+    if np is not None:
+        index = (np.arange(size)[None, :] - np.asarray(offsets)[:, None]) % size
+        return np.asarray(names, dtype=object)[index].tolist()
+    parts = range(size)
+    return [[names[(part - offset) % size] for part in parts] for offset in offsets]
+
+def part_label(index, size):
+    # "Part 7", or "Khatma 2 Part 7" for rosters sharing several khatmas
+    part = f"Part {index % engine.PARTS_PER_PAGE + 1}"
+    if size > engine.PARTS_PER_PAGE:
+        return f"Khatma {index // engine.PARTS_PER_PAGE + 1} {part}"
+    return part
+
+def schedule_table(groups, start_date, end_date):
+    # Returns (header, rows) for groups as loaded by Rotating_List_groups
+    # (name, start_date, names); the Group column is left out when no group
+    # has a name. Groups with fewer names leave the trailing part columns empty.
+    # A group with first_date/last_date only covers those days of the range
+    # and one with day_start counts its Day column from there (one roster
+    # version, see roster_groups).
+    width = max(len(group["names"]) for group in groups)
+    named = any(group["name"] for group in groups)
+    header = ["Group"] * named + ["Date", "Weekday", "Day"] + [part_label(i, width) for i in range(width)]
+    rows = []
+    for group in groups:
+        first, last = group.get("first_date", start_date), group.get("last_date", end_date)
+        dates = list(engine.date_range(first, last))
+        offsets = engine.rotation_offsets(group["start_date"], len(group["names"]), first, last)
+        padding = [""] * (width - len(group["names"]))
+        for date, assigned in zip(dates, schedule_matrix(group["names"], offsets)):
+            rows.append([group["name"]] * named + [date.date(), engine.get_day_name(date),
+                         engine.days_since_start(group.get("day_start", group["start_date"]), date)] + assigned + padding)
+    return header, rows
+
+def roster_groups(store, start_date, end_date):
+    # The versions of a RosterStore in effect during the range, as unnamed
+    # groups for schedule_table
+    return [{"name": "", "start_date": roster_start, "names": names, "first_date": first, "last_date": last,
+             "day_start": engine.START_DATE}
+            for first, last, names, roster_start in store.segments(start_date, end_date)]
+
+# ========================================
+# WRITERS
+def write_csv(filename, header, rows):
+    with open(filename, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+def write_parquet(filename, header, rows):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Parquet export needs pyarrow: pip install pyarrow")
+    columns = list(zip(*rows)) if rows else [()] * len(header)
+    table = pa.table({name: list(column) for name, column in zip(header, columns)})
+    pq.write_table(table, filename)
+
+EXPORT_FORMATS = {".csv": write_csv, ".parquet": write_parquet}
+
+def export_schedule(groups, start_date, end_date, filename):
+    # Format from the file extension; the file is written in one go to a
+    # temp file and renamed, so readers never see half an export.
+    # Returns the number of rows written.
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in EXPORT_FORMATS:
+        raise ValueError(f"unsupported export format '{extension}' (use .csv or .parquet)")
+    header, rows = schedule_table(groups, start_date, end_date)
+    tmp_file = filename + ".tmp"
+    EXPORT_FORMATS[extension](tmp_file, header, rows)
+    os.replace(tmp_file, filename)
+    return len(rows)
@@ -0,0 +1,183 @@
+"""
+Quran Parts PDF Generator - system font discovery
+Finds a regular and a bold TrueType face for the active language on Windows,
+macOS and Linux. The system font folders are scanned once into an index of
+family, style, path and Arabic coverage saved as JSON; later runs only check
+that the folders are unchanged and look the faces up, re-reading just the
+files that were added or changed when they are not.
+"""
+
+import json
+import os
+import sys
+from fontTools import ttLib
+
+# ========================================
+# CONFIGURATION
+FONT_INDEX_VERSION = 2
+FONT_EXTENSIONS = (".ttf", ".otf")
+
+# Families tried first, best match first; any other family with the needed
+# coverage is the fallback
+ENGLISH_FAMILIES = ["Arial", "Liberation Sans", "Arimo", "Helvetica", "Noto Sans", "DejaVu Sans",
+                    "FreeSans", "Segoe UI", "Verdana", "Tahoma"]
+ARABIC_FAMILIES = ["Sakkal Majalla", "Traditional Arabic", "Arial", "Simplified Arabic", "Amiri",
+                   "Noto Naskh Arabic", "Noto Sans Arabic", "Scheherazade New", "DejaVu Sans", "FreeSerif",
+                   "Tahoma"]
+
+# arabic_reshaper draws with the presentation forms (the lam-alef ligatures
+# included), so a usable Arabic font needs those as well as the basic letters
+ARABIC_CHARS = list(range(0x0621, 0x063B)) + list(range(0x0641, 0x064B)) + list(range(0xFE80, 0xFEFD))
+# The other ligature it writes by default: "Allah" (U+FDF2), as in a name like
+# "عبدالله". Fonts having it are preferred; with the others the engine shapes
+# the word letter by letter (see get_reshaper).
+ARABIC_LIGATURES = [0xFDF2]
+# Digits and letters, which dates and English names need (and symbol fonts lack)
+LATIN_CHARS = [ord(char) for char in "0123456789/#ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"]
+
+def font_dirs():
+    home = os.path.expanduser("~")
+    if sys.platform == "win32":
+        windir = os.environ.get("WINDIR", r"C:\Windows")
+        local = os.environ.get("LOCALAPPDATA", os.path.join(home, "AppData", "Local"))
+        return [os.path.join(windir, "Fonts"), os.path.join(local, "Microsoft", "Windows", "Fonts")]
+    if sys.platform == "darwin":
+        return ["/System/Library/Fonts", "/Library/Fonts", os.path.join(home, "Library", "Fonts")]
+    return ["/usr/share/fonts", "/usr/local/share/fonts", os.path.join(home, ".local", "share", "fonts"),
+            os.path.join(home, ".fonts")]
+
+# ========================================
+# SCANNING
+def read_font(path):
+    # Index entry for one font file, or None when fpdf can't embed it
+    # (no TrueType outlines) or it doesn't parse
+    try:
+        font = ttLib.TTFont(path, lazy=True)
+        if "glyf" not in font or "OS/2" not in font:
+            return None
+        names = font["name"]
+        family = names.getDebugName(16) or names.getDebugName(1)
+        style = names.getDebugName(17) or names.getDebugName(2) or "Regular"
+        os2 = font["OS/2"]
+        cmap = font.getBestCmap() or {}
+    except Exception:
+        return None
+    if not family:
+        return None
+    stat = os.stat(path)
+    return {
+        "path": path,
+        "family": family,
+        "style": style,
+        "bold": os2.usWeightClass >= 600 or bool(os2.fsSelection & 0x20),
+        "italic": bool(os2.fsSelection & 0x01),
+        "latin": all(code in cmap for code in LATIN_CHARS),
+        "arabic": round(sum(code in cmap for code in ARABIC_CHARS) / len(ARABIC_CHARS), 3),
+        "ligatures": all(code in cmap for code in ARABIC_LIGATURES),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+    }
+
+def scan_fonts(dirs, known=None):
+    # Walks dirs; returns (fonts, folders) where folders maps every folder
+    # seen to its mtime. Files unchanged since `known` (path -> entry) are
+    # not opened again.
+    known = known or {}
+    fonts, folders = [], {}
+    for top in dirs:
+        for folder, _, files in os.walk(top):
+            try:
+                folders[folder] = os.stat(folder).st_mtime_ns
+            except OSError:
+                continue
+            for name in sorted(files):
+                if not name.lower().endswith(FONT_EXTENSIONS):
+                    continue
+                path = os.path.join(folder, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entry = known.get(path)
+                if entry is None or (entry["size"], entry["mtime"]) != (stat.st_size, stat.st_mtime_ns):
+                    entry = read_font(path)
+                if entry is not None:
+                    fonts.append(entry)
+    return fonts, folders
+
+# ========================================
+# INDEX
+_index_cache = {}
+
+def index_is_current(index, dirs):
+    # Only the folders are checked: adding, removing or replacing a font
+    # changes the mtime of the folder holding it
+    if index.get("version") != FONT_INDEX_VERSION or index.get("dirs") != dirs:
+        return False
+    for folder, mtime in index["folders"].items():
+        try:
+            if os.stat(folder).st_mtime_ns != mtime:
+                return False
+        except OSError:
+            return False
+    # A font folder that didn't exist at scan time may exist now
+    return all(folder in index["folders"] for folder in dirs if os.path.isdir(folder))
+
+def load_font_index(index_file, dirs=None, rescan=False):
+    # The index of the fonts in dirs (default: the system font folders),
+    # read from index_file and rebuilt there when the folders have changed
+    dirs = dirs or font_dirs()
+    index = _index_cache.get(index_file)
+    if index is None and not rescan:
+        try:
+            with open(index_file, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = None
+    if index is not None and not rescan and index_is_current(index, dirs):
+        _index_cache[index_file] = index
+        return index
+
+    known = {entry["path"]: entry for entry in (index or {}).get("fonts", [])} if not rescan else {}
+    fonts, folders = scan_fonts(dirs, known)
+    index = {"version": FONT_INDEX_VERSION, "dirs": dirs, "folders": folders, "fonts": fonts}
+    tmp_file = index_file + ".tmp"
+    try:
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False, indent=0)
+        os.replace(tmp_file, index_file)
+    except OSError:
+        pass  # The index only saves time; the next run scans again
+    _index_cache[index_file] = index
+    return index
+
+# ========================================
+# LOOKUP
+def family_faces(fonts, family):
+    # (regular, bold) upright entries of a family; bold falls back to regular
+    upright = [entry for entry in fonts if entry["family"].lower() == family.lower() and not entry["italic"]]
+    regular = [entry for entry in upright if not entry["bold"]]
+    bold = [entry for entry in upright if entry["bold"]]
+    if not regular:
+        return None
+    # Prefer the plain "Regular"/"Bold" styles over Light, Condensed and such
+    regular.sort(key=lambda entry: (entry["style"].lower() not in ("regular", "book", "normal"), entry["path"]))
+    bold.sort(key=lambda entry: (entry["style"].lower() != "bold", entry["path"]))
+    return regular[0], (bold or regular)[0]
+
+def find_font_files(index, arabic):
+    # (regular path, bold path) for the language; raises ValueError when no
+    # installed font will do
+    fonts = [entry for entry in index["fonts"] if entry["latin"]]
+    if arabic:
+        fonts = [entry for entry in fonts if entry["arabic"] >= 1.0]
+        fonts = [entry for entry in fonts if entry["ligatures"]] or fonts
+    preferred = ARABIC_FAMILIES if arabic else ENGLISH_FAMILIES
+    others = sorted({entry["family"] for entry in fonts} - set(preferred))
+    for family in preferred + others:
+        faces = family_faces(fonts, family)
+        if faces:
+            return faces[0]["path"], faces[1]["path"]
+    language = "Arabic" if arabic else "English"
+    raise ValueError(f"no TrueType font for {language} text found in {', '.join(index['dirs'])}; "
+                     "set FONT_PATH or pass --font")
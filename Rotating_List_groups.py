@@ -0,0 +1,140 @@
+"""
+Quran Parts PDF Generator - multi-group scheduler
+Schedules many independent reading groups, each with its own start date,
+roster and colors, over one date range in a single pass: the rotation offsets
+of every group and day are computed together, and the days of all groups
+share one process pool.
+
+A groups file is a JSON list; names come inline or from a file next to it:
+    [
+      {"name": "Sisters Circle", "start_date": "2025/08/16", "names_file": "sisters.txt"},
+      {"name": "Youth", "start_date": "2025/09/01", "names": ["Ali", "Omar", "..."],
+       "colors": {"borders": "#0055aa"}}
+    ]
+"""
+
+import json
+import os
+import re
+from datetime import datetime
+
+import Rotating_List_engine as engine
+
+# ========================================
+# GROUPS FILE
+def parse_group_date(text):
+    for fmt in ("%Y/%m/%d", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(str(text).strip(), fmt)
+        except ValueError:
+            pass
+    raise ValueError(f"invalid date '{text}' (use YYYY/MM/DD)")
+
+def group_folder_name(name):
+    # Output subfolder for a group: its name without path separators and such
+    return re.sub(r"[^\w\- ]+", "_", name).strip(" .") or "group"
+
+def load_groups(path, colors=None):
+    # Returns a list of groups: dicts with name, folder, start_date, names
+    # and colors (the group's own colors over `colors`/DEFAULT_COLORS)
+    base = os.path.dirname(os.path.abspath(path))
+    with open(path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    if not isinstance(entries, list):
+        raise ValueError(f"{path} must hold a JSON list of groups")
+
+    groups, folders = [], set()
+    for number, entry in enumerate(entries, 1):
+        name = str(entry.get("name") or f"Group {number}")
+        if "names" in entry:
+            names = [str(n).strip() for n in entry["names"] if str(n).strip()]
+        elif "names_file" in entry:
+            names = engine.read_names(os.path.join(base, entry["names_file"]))
+        else:
+            raise ValueError(f"group '{name}' needs 'names' or 'names_file'")
+        if not names:
+            raise ValueError(f"group '{name}' has no names")
+
+        group_colors = dict(colors or engine.DEFAULT_COLORS)
+        unknown = set(entry.get("colors", {})) - set(group_colors)
+        if unknown:
+            raise ValueError(f"group '{name}' has unknown color keys: {', '.join(sorted(unknown))}")
+        group_colors.update(entry.get("colors", {}))
+        for value in group_colors.values():
+            engine.hex_to_rgb(value)  # raises ValueError on a malformed color
+
+        folder = group_folder_name(name)
+        if folder.lower() in folders:
+            raise ValueError(f"two groups would share the output folder '{folder}'")
+        folders.add(folder.lower())
+
+        start_date = parse_group_date(entry["start_date"]) if entry.get("start_date") else engine.START_DATE
+        groups.append({"name": name, "folder": folder, "start_date": start_date,
+                       "names": names, "colors": group_colors})
+    return groups
+
+# ========================================
+# SCHEDULE
+def schedule(groups, start_date, end_date):
+    # Rotation offset of each group (rows) for each day of the range
+    # (columns). Offsets step by one a day, so each row is a single
+    # arithmetic run rather than days_since_start + rotate_list per day.
+    return [engine.rotation_offsets(group["start_date"], len(group["names"]), start_date, end_date)
+            for group in groups]
+
+# ========================================
+# GENERATION
+def generate_groups(groups, start_date, end_date, output_folder, workers=engine.PDF_WORKERS, force=False,
+                    progress=None, cancel=None, profile=None):
+    # MM-DD.pdf files for every group in output_folder/<group folder>, all
+    # groups' days rendered by one process pool. Returns {group name:
+    # (generated, skipped, failures)} like generate_pdf_range. With
+    # PROFILE_STAGES, one profile.json for the whole run is saved in output_folder.
+    offsets = schedule(groups, start_date, end_date)
+    plans, jobs, texts = [], [], []
+    for group, group_offsets in zip(groups, offsets):
+        folder = os.path.join(output_folder, group["folder"])
+        os.makedirs(folder, exist_ok=True)
+        group_jobs, hashes, skipped = engine.plan_range(
+            group["names"], start_date, end_date, folder, group["colors"],
+            roster_start=group["start_date"], force=force, offsets=group_offsets)
+        plans.append((group, folder, hashes, skipped))
+        jobs += group_jobs
+        texts += group["names"]
+
+    profile = engine.start_profile(profile) if jobs else None
+    if jobs:
+        engine.prepare_shaping(engine.range_texts(texts, start_date, end_date), profile)
+    results = engine.run_days(jobs, workers, progress, cancel, profile)
+    engine.finish_profile(profile, output_folder)
+
+    summary = {}
+    for group, folder, hashes, skipped in plans:
+        group_results = [result for result in results if os.path.dirname(result[1]) == folder]
+        generated, failures = engine.record_results(folder, hashes, group_results) if group_results else (0, [])
+        summary[group["name"]] = (generated, skipped, failures)
+    return summary
+
+def generate_group_documents(groups, start_date, end_date, output_folder, progress=None, cancel=None):
+    # One multi-page PDF per group in output_folder/<group folder>; returns
+    # {group name: pages}. progress(done, total) counts days over all groups.
+    total = len(groups) * ((end_date.date() - start_date.date()).days + 1)
+    done = 0
+
+    def report(days, _):
+        if progress:
+            progress(done + days, total)
+
+    engine.prepare_shaping(engine.range_texts([n for g in groups for n in g["names"]], start_date, end_date))
+    summary = {}
+    for group in groups:
+        if cancel is not None and cancel.is_set():
+            break
+        folder = os.path.join(output_folder, group["folder"])
+        os.makedirs(folder, exist_ok=True)
+        filename = os.path.join(folder, engine.document_filename(start_date, end_date))
+        summary[group["name"]] = engine.generate_pdf_document(
+            group["names"], start_date, end_date, filename, group["colors"],
+            progress=report, cancel=cancel, roster_start=group["start_date"])
+        done += (end_date.date() - start_date.date()).days + 1
+    return summary
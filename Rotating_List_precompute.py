@@ -0,0 +1,162 @@
+"""
+Quran Parts PDF Generator - precompute daemon
+Keeps the daily PDFs of a rolling window of days (today and the next ones)
+generated ahead of time, so a morning print job always finds its MM-DD.pdf
+waiting instead of someone having to run the generator first.
+Every few seconds it checks for a new day, a changed roster (roster.db or a
+names file) and a changed theme file; the build manifest then tells which
+days are missing or out of date. Today is rendered first, at normal priority;
+before the first later day the process lowers its CPU priority for good, and
+the rest follow one day at a time, starting over as soon as the inputs change
+again. (Once a day rolls over, its file was normally already rendered as an
+upcoming day.) Files are replaced atomically, so a reader never waits on or
+sees a half-written PDF.
+"""
+
+import os
+import sys
+import threading
+from datetime import datetime, timedelta
+
+import Rotating_List_engine as engine
+from Rotating_List_roster import RosterStore
+
+# ========================================
+# CONFIGURATION
+PRECOMPUTE_DAYS = 14  # Today and the 13 days after it
+CHECK_INTERVAL = 5.0  # Seconds between checks for a new day or changed inputs
+PRECOMPUTE_NICE = 10  # Lower priority for the days after today, so they only take idle CPU time
+BELOW_NORMAL_PRIORITY_CLASS = 0x4000  # Its Windows counterpart
+
+_priority_lowered = False
+
+def file_stamp(path):
+    # Changes when the file is saved again; None when missing
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def today():
+    return datetime.combine(datetime.now().date(), datetime.min.time())
+
+# ========================================
+# DAEMON
+class Precomputer:
+    def __init__(self, roster, output_folder, days=PRECOMPUTE_DAYS, colors_file=None, load_colors=None,
+                 log=print):
+        # roster is a RosterStore or the path of a names file. load_colors
+        # turns colors_file into a colors dict (see the CLI's theme files).
+        if not 1 <= days <= 365:
+            raise ValueError("the window must be 1 to 365 days, MM-DD.pdf names repeat after a year")
+        self.roster_store = roster if isinstance(roster, RosterStore) else None
+        self.names_file = None if self.roster_store else roster
+        self.output_folder = output_folder
+        self.days = days
+        self.colors_file = colors_file
+        self.load_colors = load_colors
+        self.log = log
+        self.names, self.colors = None, dict(engine.DEFAULT_COLORS)
+        self.loaded = None  # inputs() when names and colors were last loaded
+
+    def inputs(self):
+        roster = self.roster_store.revision() if self.roster_store else file_stamp(self.names_file)
+        return today(), roster, file_stamp(self.colors_file)
+
+    def reload(self, inputs):
+        # A names or theme file caught half-saved keeps the previous one
+        # until the next save
+        if self.roster_store is not None:
+            self.names = self.roster_store
+        elif inputs[1] is None:
+            self.names = list(engine.DEFAULT_NAMES)
+        else:
+            names = engine.read_names(self.names_file)
+            if names:
+                self.names = names
+            elif self.names is None:
+                self.names = list(engine.DEFAULT_NAMES)
+        if self.colors_file and self.load_colors:
+            try:
+                self.colors = self.load_colors(self.colors_file)
+            except (OSError, ValueError) as e:
+                self.log(f"⚠️ Keeping the previous colors: {e}")
+        self.loaded = inputs
+
+    def refresh(self, stop=None):
+        # Brings the window up to date; returns (written, failures). Stops
+        # early when stop is set or the inputs change, the next call then
+        # starts over from today with the new ones.
+        inputs = self.inputs()
+        if inputs != self.loaded:
+            self.reload(inputs)
+        first = inputs[0]
+        last = first + timedelta(days=self.days - 1)
+        jobs, hashes, _ = engine.plan_range(self.names, first, last, self.output_folder, self.colors)
+        if not jobs:
+            return 0, []
+        engine.prepare_shaping(engine.range_texts(engine.roster_names(self.names, first, last), first, last))
+
+        written, failures = 0, []
+        for job in jobs:  # In date order, today first
+            if (stop is not None and stop.is_set()) or self.inputs() != inputs:
+                break
+            if job[1] != first:
+                lower_priority()  # Only today is worth taking CPU from others
+            # Recorded day by day, so an interrupted pass keeps what it wrote
+            results = engine.run_days([job], workers=1)
+            generated, day_failures = engine.record_results(self.output_folder, hashes, results)
+            written += generated
+            failures += day_failures
+        return written, failures
+
+    def run(self, stop=None, interval=CHECK_INTERVAL, once=False):
+        # Keeps refreshing until stop is set (or after one pass with once)
+        stop = stop or threading.Event()
+        os.makedirs(self.output_folder, exist_ok=True)
+        reported = {}  # Failed days are retried on every check, logged once
+        written, failures = 0, []
+        while not stop.is_set():
+            written, failures = self.refresh(stop)
+            if written:
+                self.log(f"✅ {written} PDFs brought up to date in {self.output_folder}")
+            for date, error in failures:
+                if reported.get(date) != error:
+                    self.log(f"❌ {date.strftime('%Y/%m/%d')}: {error}")
+            reported = dict(failures)
+            if once:
+                return written, failures
+            stop.wait(interval)
+        return written, failures
+
+def lower_priority():
+    # Once per process: an unprivileged process cannot raise its nice value
+    # back, so Windows keeps the lower class as well
+    global _priority_lowered
+    if _priority_lowered:
+        return
+    _priority_lowered = True
+    if sys.platform == "win32":
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        if not kernel32.SetPriorityClass(kernel32.GetCurrentProcess(), BELOW_NORMAL_PRIORITY_CLASS):
+            print("⚠️ Could not lower the process priority")
+    elif hasattr(os, "nice"):
+        try:
+            os.nice(PRECOMPUTE_NICE)
+        except OSError:
+            pass
+
+def precompute(roster, output_folder, days=PRECOMPUTE_DAYS, colors_file=None, load_colors=None,
+               interval=CHECK_INTERVAL, once=False):
+    # Runs the daemon in the foreground until Ctrl+C; returns the failures
+    # of the last pass
+    precomputer = Precomputer(roster, output_folder, days, colors_file, load_colors)
+    print(f"🗓️ Keeping the next {days} days ready in {output_folder}")
+    try:
+        return precomputer.run(interval=interval, once=once)[1]
+    except KeyboardInterrupt:
+        return []
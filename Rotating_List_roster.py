@@ -0,0 +1,111 @@
+"""
+Quran Parts PDF Generator - roster versions
+Keeps every roster in one SQLite file, each version keyed by the date it takes
+effect, so regenerating an old date uses the names of that time instead of
+today's. A version holds the names in part order on its effective date (the
+first name reads part 1 that day) and rotates one step a day from there until
+the next version starts. Versions are stored in a table whose primary key is
+the effective date, so finding the one in effect on a date is a single
+B-tree search, O(log n) however long the history gets.
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+# ========================================
+# CONFIGURATION
+ROSTER_SCHEMA_VERSION = 1
+DATE_FORMAT = "%Y-%m-%d"  # Sorts like the dates it stands for
+
+# ========================================
+# STORE
+class RosterStore:
+    def __init__(self, path):
+        self.path = path
+        # The GUIs save from a timer thread and generate on another one
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.db:
+            version = self.db.execute("PRAGMA user_version").fetchone()[0]
+            if version not in (0, ROSTER_SCHEMA_VERSION):
+                raise ValueError(f"{path} is a version {version} roster file, expected {ROSTER_SCHEMA_VERSION}")
+            self.db.execute("""CREATE TABLE IF NOT EXISTS roster_versions (
+                                   effective_date TEXT PRIMARY KEY,
+                                   names TEXT NOT NULL,
+                                   saved_at TEXT NOT NULL
+                               ) WITHOUT ROWID""")
+            self.db.execute(f"PRAGMA user_version = {ROSTER_SCHEMA_VERSION}")
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+    def query(self, sql, *args):
+        with self.lock:
+            return self.db.execute(sql, args).fetchall()
+
+    def is_empty(self):
+        return not self.query("SELECT 1 FROM roster_versions LIMIT 1")
+
+    def save_version(self, names, effective_date):
+        # names in part order on effective_date; replaces a version saved
+        # for the same date before
+        names = list(names)
+        if not names or not all(isinstance(name, str) and name.strip() for name in names):
+            raise ValueError("a roster version needs at least one name and no empty names")
+        with self.lock, self.db:
+            self.db.execute("""INSERT INTO roster_versions VALUES (?, ?, ?)
+                               ON CONFLICT(effective_date) DO UPDATE
+                               SET names = excluded.names, saved_at = excluded.saved_at""",
+                            (effective_date.strftime(DATE_FORMAT), json.dumps(names, ensure_ascii=False),
+                             datetime.now().isoformat(timespec="seconds")))
+
+    def remove_version(self, effective_date):
+        # Returns whether there was a version starting on effective_date
+        with self.lock, self.db:
+            cursor = self.db.execute("DELETE FROM roster_versions WHERE effective_date = ?",
+                                     (effective_date.strftime(DATE_FORMAT),))
+            return cursor.rowcount > 0
+
+    def roster_on(self, date):
+        # (names, effective date) of the version in effect on date: the
+        # latest one starting on or before it, or the first one for dates
+        # before any version. Raises ValueError when the store is empty.
+        rows = self.query("""SELECT effective_date, names FROM roster_versions
+                             WHERE effective_date <= ? ORDER BY effective_date DESC LIMIT 1""",
+                          date.strftime(DATE_FORMAT))
+        if not rows:
+            rows = self.query("SELECT effective_date, names FROM roster_versions ORDER BY effective_date LIMIT 1")
+        if not rows:
+            raise ValueError(f"no roster saved in {self.path}")
+        effective, names = rows[0]
+        return json.loads(names), datetime.strptime(effective, DATE_FORMAT)
+
+    def segments(self, start_date, end_date):
+        # [(first day, last day, names, effective date)] covering the range,
+        # one entry per version in effect during it, in date order
+        current = self.roster_on(start_date)
+        rows = self.query("""SELECT effective_date, names FROM roster_versions
+                             WHERE effective_date > ? AND effective_date <= ? ORDER BY effective_date""",
+                          start_date.strftime(DATE_FORMAT), end_date.strftime(DATE_FORMAT))
+        segments, first = [], start_date
+        for effective, names in rows:
+            effective = datetime.strptime(effective, DATE_FORMAT)
+            segments.append((first, effective - timedelta(days=1)) + current)
+            first, current = effective, (json.loads(names), effective)
+        segments.append((first, end_date) + current)
+        return segments
+
+    def versions(self):
+        # [(effective date, names, saved at)] of every version, oldest first
+        return [(datetime.strptime(effective, DATE_FORMAT), json.loads(names), saved_at)
+                for effective, names, saved_at in
+                self.query("SELECT effective_date, names, saved_at FROM roster_versions ORDER BY effective_date")]
+
+    def revision(self):
+        # Changes when any connection, in this process or another, commits a
+        # change; lets a long-running reader notice edits
+        with self.lock:
+            return self.db.total_changes, self.db.execute("PRAGMA data_version").fetchone()[0]
@@ -0,0 +1,161 @@
+"""
+Quran Parts PDF Generator - local schedule server
+Serves the schedule PDF of any date over HTTP, e.g. for screens in several
+rooms that keep showing today's page:
+    GET /schedule/2025-08-16.pdf
+    GET /schedule/today.pdf
+Rendered PDFs are kept in an LRU cache and sent with an ETag made from the
+day's inputs, so a screen asking again with If-None-Match gets an empty 304.
+Each date uses the roster version in effect on it (roster.db), or a names
+file that is re-read when it changes. Only the standard library is used and
+it listens on 127.0.0.1 unless told otherwise.
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import Rotating_List_engine as engine
+from Rotating_List_roster import RosterStore
+
+# ========================================
+# CONFIGURATION
+SCHEDULE_CACHE_SIZE = 128  # Rendered days kept in memory
+SCHEDULE_PATH = re.compile(r"^/schedule/(\d{4}-\d{2}-\d{2}|today)\.pdf$")
+
+# ========================================
+# SERVER
+class ScheduleServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, roster, colors, cache_size=SCHEDULE_CACHE_SIZE):
+        # roster is a RosterStore or the path of a names file
+        super().__init__(address, ScheduleHandler)
+        self.roster_store = roster if isinstance(roster, RosterStore) else None
+        self.names_file = None if self.roster_store else roster
+        self.colors = colors
+        self.cache_size = cache_size
+        self.cache = OrderedDict()  # (roster version, date) -> (etag, pdf bytes)
+        self.cache_lock = threading.Lock()
+        # fpdf and the engine's template caches are not meant for concurrent
+        # use, so renders take turns; cached days are served in parallel
+        self.render_lock = threading.Lock()
+        self.names, self.names_mtime, self.names_version = None, None, 0
+
+    def roster(self):
+        # Returns (version, names); names is the store itself, whose revision
+        # changes with every saved version, or the names file, reloaded when
+        # it changes
+        if self.roster_store is not None:
+            return self.roster_store.revision(), self.roster_store
+        try:
+            mtime = os.stat(self.names_file).st_mtime_ns
+        except OSError:
+            mtime = None
+        with self.cache_lock:
+            if self.names is None or mtime != self.names_mtime:
+                # A file caught empty, e.g. half-saved, keeps the previous names
+                names = engine.read_names(self.names_file) if mtime else list(engine.DEFAULT_NAMES)
+                if names or self.names is None:
+                    self.names = names
+                    self.names_version += 1
+                self.names_mtime = mtime
+            return self.names_version, self.names
+
+    def cached(self, key):
+        with self.cache_lock:
+            entry = self.cache.get(key)
+            if entry is not None:
+                self.cache.move_to_end(key)
+            return entry
+
+    def store(self, key, entry):
+        with self.cache_lock:
+            self.cache[key] = entry
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+    def schedule_etag(self, names, date):
+        rotated = engine.names_on(names, date)
+        digest = engine.day_input_hash(rotated, date, self.colors, engine.font_identity())
+        return f'"{digest[:32]}"', rotated
+
+    def render(self, key, rotated, date, etag):
+        with self.render_lock:
+            entry = self.cached(key)  # Another request may have rendered it meanwhile
+            if entry is None:
+                entry = (etag, engine.render_pdf(rotated, date, self.colors))
+                self.store(key, entry)
+        return entry
+
+class ScheduleHandler(BaseHTTPRequestHandler):
+    server_version = "RotatingListPDF/1.0"
+
+    def do_GET(self):
+        self.send_schedule(with_body=True)
+
+    def do_HEAD(self):
+        self.send_schedule(with_body=False)
+
+    def send_schedule(self, with_body):
+        match = SCHEDULE_PATH.match(self.path.split("?", 1)[0])
+        if not match:
+            self.send_error(404, "Use /schedule/YYYY-MM-DD.pdf or /schedule/today.pdf")
+            return
+        if match.group(1) == "today":
+            date = datetime.combine(datetime.now().date(), datetime.min.time())
+        else:
+            try:
+                date = datetime.strptime(match.group(1), "%Y-%m-%d")
+            except ValueError:
+                self.send_error(400, "Invalid date")
+                return
+
+        version, names = self.server.roster()
+        key = (version, date.date())
+        entry = self.server.cached(key)
+        if entry is None:
+            # The ETag only depends on the inputs, so a screen that already
+            # has this day is answered without rendering it again
+            etag, rotated = self.server.schedule_etag(names, date)
+        else:
+            etag = entry[0]
+
+        known = [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]
+        if etag in known or "*" in known:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        if entry is None:
+            try:
+                entry = self.server.render(key, rotated, date, etag)
+            except Exception as e:
+                self.send_error(500, f"{type(e).__name__}: {e}")
+                return
+
+        data = entry[1]
+        self.send_response(200)
+        self.send_header("Content-Type", "application/pdf")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Content-Disposition", f'inline; filename="{date.strftime("%Y-%m-%d")}.pdf"')
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")  # Always revalidate, the 304 is cheap
+        self.end_headers()
+        if with_body:
+            self.wfile.write(data)
+
+def serve(roster, colors, host="127.0.0.1", port=8000, cache_size=SCHEDULE_CACHE_SIZE):
+    server = ScheduleServer((host, port), roster, colors, cache_size)
+    print(f"🌐 Serving schedules on http://{host}:{server.server_port}/schedule/today.pdf")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -4,9 +4,9 @@ Creates daily PDF schedules for 30 people rotating through Quran Juz' assignment
 Toggle USE_ARABIC = True/False at the top for language choice.
 """
 
-from fpdf import FPDF
 import os
 from datetime import datetime
+from Rotating_List_drawing import StatePDF
 # ========================================
 # TOGGLE LANGUAGE SUPPORT HERE
 USE_ARABIC = False  # Set True for Arabic names/headers (requires extra pip installs)
@@ -87,10 +87,11 @@ def rotate_list(lst, n):
 
 # ========================================
 # PDF CLASS
-class PDF(FPDF):
+class PDF(StatePDF):
+    # Repeated color and font settings in the row loop are skipped by StatePDF
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.add_font('Arial', '', FONT_PATH, uni=True)
+        # Only the bold face is used; every registered face gets embedded
         self.add_font('Arial', 'B', FONT_PATH, uni=True)
 
     def header(self):
@@ -166,6 +167,7 @@ def generate_pdf(names, day_num, date, filename):
         pdf.ln()
 
     pdf.output(filename)
+    return pdf.state.removed
 
 # ========================================
 # MAIN
@@ -182,8 +184,9 @@ def main():
     print(f"Generating PDF for today: {pdf_filename}")
     print(f"Output: {pdf_path}")
     
-    generate_pdf(rotated_names, day_num, datetime.now(), pdf_path)
+    removed = generate_pdf(rotated_names, day_num, datetime.now(), pdf_path)
     print("✅ PDF generated successfully on Desktop!")
+    print(f"🧹 Skipped {removed} repeated color and font settings")
     print("\nPreview of today's assignment:")
     print("Parts 1-15:", rotated_names[:15])
     print("Parts 16-30:", rotated_names[15:])
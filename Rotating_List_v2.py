@@ -1,183 +1,30 @@
 """
 Quran Parts PDF Generator - v2 (Tkinter GUI with English/Arabic Toggle)
-Creates daily PDF schedules for 30 people rotating through Quran Juz' assignments.
-Toggle USE_ARABIC = True/False at the top for language choice.
+Creates daily PDF schedules for people rotating through Quran Juz' assignments
+(30 per khatma; larger rosters get one page per khatma).
+Toggle USE_ARABIC = True/False at the top of Rotating_List_engine.py for language choice.
 """
 
 import os
-from datetime import datetime, timedelta
-from fpdf import FPDF
+import queue
+import threading
+import time
+from datetime import datetime
 import tkinter as tk
 from tkinter import messagebox, ttk, colorchooser
+from Rotating_List_engine import (
+    USE_ARABIC, START_DATE, PARTS_PER_PAGE, ROWS_PER_COLUMN, folder_path, get_roster_store, names_on,
+    NamesSaver, days_since_start, generate_pdf_range, generate_pdf_document, document_filename,
+    generate_pdf_archive, archive_filename,
+    PROFILE_STAGES, format_progress, format_profile
+)
 
-# ========================================
-# TOGGLE LANGUAGE SUPPORT HERE
-USE_ARABIC = False  # Set True for Arabic names/headers (requires extra pip installs)
-
-# ========================================
-# CONFIGURATION
-FONT_PATH = r"C:\Windows\Fonts\arial.ttf"  # Change to MAJALLA.TTF for Arabic
-START_DATE = datetime(2025, 8, 16)
-desktop_path = os.path.join(os.path.expanduser("~"), "Desktop")
-folder_name = "Parts"
-folder_path = os.path.join(desktop_path, folder_name)
-os.makedirs(folder_path, exist_ok=True)
-names_file = os.path.join(folder_path, "names.txt")
-
-# Language content
-if USE_ARABIC:
-    # Requires: pip install arabic-reshaper python-bidi
-    try:
-        import arabic_reshaper
-        from bidi.algorithm import get_display
-        
-        HEADERS = ["رقم الجزء", "الاسم", "رقم الجزء", "الاسم"]
-        DAYS_ARABIC = {
-            "Monday": "الاثنين", "Tuesday": "الثلاثاء", "Wednesday": "الأربعاء",
-            "Thursday": "الخميس", "Friday": "الجمعة", "Saturday": "السبت", "Sunday": "الأحد"
-        }
-        DEFAULT_NAMES = [
-            "عبدالله", "فاطمة", "أحمد", "مريم", "عمر", "زينب", "خالد", "نور", "يوسف", "سارة",
-            "إبراهيم", "عائشة", "محمود", "ليلى", "حسن", "رقية", "علي", "سمية", "مصطفى", "هدى",
-            "بشرى", "سلمى", "عبدالرحمن", "أسماء", "طارق", "نادية", "فيصل", "منى", "سعيد", "جميلة"
-        ]
-        
-        def reshape_arabic(text):
-            reshaped = arabic_reshaper.reshape(text)
-            return get_display(reshaped)
-    except ImportError:
-        print("⚠️ Arabic libraries not found. Install: pip install arabic-reshaper python-bidi")
-        USE_ARABIC = False
-        HEADERS = ["Part #", "Name", "Part #", "Name"]
-        DAYS_ARABIC = {}
-        DEFAULT_NAMES = [
-            "Nathan", "Michael", "Taylor", "Jessica", "Alex", "Sarah", "David", "Emily", 
-            "James", "Olivia", "Sarah", "David", "Michael", "Andrew", "Henry", 
-            "Bella", "Rachel", "Samuel", "Oliver", "Mia", "Riley", "Isaac", 
-            "Noah James", "Sophia", "Russell", "Nora", "Susan", "Noah Andrew", "Amy", "Oscar"
-        ]
-        def reshape_arabic(text):
-            return text
-else:
-    HEADERS = ["Part #", "Name", "Part #", "Name"]
-    DAYS_ARABIC = {}
-    DEFAULT_NAMES = [
-        "Nathan", "Michael", "Taylor", "Jessica", "Alex", "Sarah", "David", "Emily", 
-        "James", "Olivia", "Sarah", "David", "Michael", "Andrew", "Henry", 
-        "Bella", "Rachel", "Samuel", "Oliver", "Mia", "Riley", "Isaac", 
-        "Noah James", "Sophia", "Russell", "Nora", "Susan", "Noah Andrew", "Amy", "Oscar"
-    ]
-    def reshape_arabic(text):
-        return text
-
-# ========================================
-# HELPERS
-def load_names():
-    if os.path.exists(names_file):
-        with open(names_file, "r", encoding="utf-8") as f:
-            return [line.strip() for line in f if line.strip()]
-    return DEFAULT_NAMES.copy()
-
-def save_names(names_list):
-    with open(names_file, "w", encoding="utf-8") as f:
-        for name in names_list:
-            f.write(name + "\n")
-
-def days_since_start(start_date, current_date):
-    delta = current_date.date() - start_date.date()
-    return delta.days if delta.days >= 0 else 0
-
-def rotate_list(lst, n):
-    n = n % len(lst)
-    return lst[-n:] + lst[:-n]
-
-def hex_to_rgb(hex_color):
-    hex_color = (hex_color or "#000000").lstrip("#")
-    return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
-
-def get_day_name(date):
-    day_english = date.strftime("%A")
-    return DAYS_ARABIC.get(day_english, day_english)
-
-# ========================================
-# PDF GENERATION
-class PDF(FPDF):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.add_font('Arial', '', FONT_PATH, uni=True)
-        self.add_font('Arial', 'B', FONT_PATH, uni=True)
-
-def generate_pdf(names, day_num, date, filename, colors):
-    pdf = PDF()
-    pdf.set_margins(5, 5, 5)
-    pdf.add_page()
-    
-    # Header with date and day name
-    pdf.set_font("Arial", 'B', 38)
-    header_text = f"{date.strftime('%Y/%m/%d')} {get_day_name(date)}"
-    pdf.cell(0, 15, reshape_arabic(header_text), ln=1, align='C')
-    pdf.ln(5)
-    
-    # Table setup
-    col_name_w, col_num_w, row_h = 75, 20, 15
-    
-    # Header row
-    header_fill_rgb = hex_to_rgb(colors.get("header_fill"))
-    header_text_rgb = hex_to_rgb(colors.get("header_text"))
-    border_rgb = hex_to_rgb(colors.get("borders"))
-    
-    pdf.set_draw_color(*border_rgb)
-    pdf.set_fill_color(*header_fill_rgb)
-    pdf.set_text_color(*header_text_rgb)
-    pdf.set_line_width(1.2)
-    pdf.set_font("Arial", 'B', 16)
-    
-    for header in HEADERS:
-        pdf.cell(col_num_w if "Part" in header or "رقم" in header else col_name_w, 
-                row_h, reshape_arabic(header), border=1, align='C', fill=True)
-    pdf.ln()
-    
-    # Data rows
-    row1_rgb = hex_to_rgb(colors.get("row_bg1"))
-    row2_rgb = hex_to_rgb(colors.get("row_bg2"))
-    text_rgb = hex_to_rgb(colors.get("text"))
-    numbers_rgb = hex_to_rgb(colors.get("numbers"))
-    names_bg_rgb = hex_to_rgb(colors.get("names_bg"))
-    
-    pdf.set_draw_color(*border_rgb)
-    pdf.set_line_width(1.2)
-    
-    half = len(names) // 2
-    numbers_left, numbers_right = list(range(1, 16)), list(range(16, 31))
-    right_names, left_names = names[half:], names[:half]
-    
-    for i in range(half):
-        row_fill = row1_rgb if i % 2 == 0 else row2_rgb
-        
-        # Right column number
-        pdf.set_fill_color(*row_fill)
-        pdf.set_text_color(*numbers_rgb)
-        pdf.set_font("Arial", 'B', 28)
-        pdf.cell(col_num_w, row_h, str(numbers_right[i]), border=1, align='C', fill=True)
-        
-        # Right column name
-        pdf.set_fill_color(*names_bg_rgb)
-        pdf.set_text_color(*text_rgb)
-        pdf.cell(col_name_w, row_h, reshape_arabic(right_names[i]), border=1, align='C', fill=True)
-        
-        # Left column number
-        pdf.set_fill_color(*row_fill)
-        pdf.set_text_color(*numbers_rgb)
-        pdf.cell(col_num_w, row_h, str(numbers_left[i]), border=1, align='C', fill=True)
-        
-        # Left column name
-        pdf.set_fill_color(*names_bg_rgb)
-        pdf.set_text_color(*text_rgb)
-        pdf.cell(col_name_w, row_h, reshape_arabic(left_names[i]), border=1, align='C', fill=True)
-        
-        pdf.ln()
-    
-    pdf.output(filename)
+# What the Generate button writes, by menu label
+OUTPUT_MODES = {
+    "Separate PDFs (MM-DD.pdf)": "files",
+    "One multi-page PDF": "document",
+    "One ZIP archive": "archive",
+}
 
 # ========================================
 # TKINTER GUI
@@ -227,47 +74,55 @@ class NamesDateApp(tk.Tk):
                                     bg="#f0f7ff", font=("Arial", 12, "bold"))
         self.names_header.pack(pady=5, anchor="w", padx=6)
         
-        # Load saved names or default
-        self.original_names = load_names()
-        
-        cols_container = tk.Frame(names_frame, bg="#f0f7ff")
-        cols_container.pack(fill="both", expand=True, padx=6, pady=6)
-        
-        # Right column (numbers 16..30)
-        right_col = tk.Frame(cols_container, bg="#f0f7ff")
-        right_col.pack(side="left", fill="both", expand=True, padx=(0,8))
-        tk.Label(right_col, text="Parts 16-30", bg="#f0f7ff", font=("Arial", 11, "bold")).pack(anchor="w")
-        
-        # Left column (numbers 1..15)
-        left_col = tk.Frame(cols_container, bg="#f0f7ff")
-        left_col.pack(side="left", fill="both", expand=True, padx=(8,0))
-        tk.Label(left_col, text="Parts 1-15", bg="#f0f7ff", font=("Arial", 11, "bold")).pack(anchor="w")
-        
-        self.left_entries = []   # corresponds to names[:15] (numbers 1..15)
-        self.right_entries = []  # corresponds to names[15:] (numbers 16..30)
-        
-        for i in range(15):
-            # right column row (number 16..30)
-            r_row = tk.Frame(right_col, bg="#f0f7ff")
-            r_row.pack(fill="x", pady=2)
-            r_num = tk.Label(r_row, text=str(16 + i), width=4, anchor="e", bg="#f0f7ff", font=("Arial", 11))
-            r_num.pack(side="left")
-            r_ent = tk.Entry(r_row, font=("Arial", 12))
-            r_ent.pack(side="left", fill="x", expand=True, padx=(6,0))
-            r_ent.bind("<KeyRelease>", self.auto_save_names)
-            self.right_entries.append(r_ent)
+        # Roster versions by effective date; edits apply from the preview date on
+        self.roster = get_roster_store()
+        self.original_names = list(names_on(self.roster, self.edit_date()))
+        self.names_saver = NamesSaver()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # Scrollable area: larger rosters get one block of parts 1-30 per khatma
+        names_canvas = tk.Canvas(names_frame, bg="#f0f7ff", highlightthickness=0)
+        names_scrollbar = tk.Scrollbar(names_frame, orient="vertical", command=names_canvas.yview)
+        names_canvas.configure(yscrollcommand=names_scrollbar.set)
+        names_scrollbar.pack(side="right", fill="y")
+        names_canvas.pack(fill="both", expand=True, padx=6, pady=6)
+        cols_container = tk.Frame(names_canvas, bg="#f0f7ff")
+        container_window = names_canvas.create_window((0, 0), window=cols_container, anchor="nw")
+        cols_container.bind("<Configure>", lambda e: names_canvas.configure(scrollregion=names_canvas.bbox("all")))
+        names_canvas.bind("<Configure>", lambda e: names_canvas.itemconfigure(container_window, width=e.width))
+        
+        self.name_entries = []  # indexed like the names: parts 1..30 of each khatma in turn
+        entry_count = max((len(names) for _, names, _ in self.roster.versions()), default=PARTS_PER_PAGE)
+        
+        for block_start in range(0, entry_count, PARTS_PER_PAGE):
+            block = tk.Frame(cols_container, bg="#f0f7ff")
+            block.pack(fill="x", pady=(0, 8))
+            if entry_count > PARTS_PER_PAGE:
+                tk.Label(block, text=f"Khatma {block_start // PARTS_PER_PAGE + 1}", bg="#f0f7ff",
+                        font=("Arial", 12, "bold")).pack(anchor="w")
             
-            # left column row (number 1..15)
-            l_row = tk.Frame(left_col, bg="#f0f7ff")
-            l_row.pack(fill="x", pady=2)
-            l_num = tk.Label(l_row, text=str(1 + i), width=4, anchor="e", bg="#f0f7ff", font=("Arial", 11))
-            l_num.pack(side="left")
-            l_ent = tk.Entry(l_row, font=("Arial", 12))
-            l_ent.pack(side="left", fill="x", expand=True, padx=(6,0))
-            l_ent.bind("<KeyRelease>", self.auto_save_names)
-            self.left_entries.append(l_ent)
+            # Right column (numbers 16..30)
+            right_col = tk.Frame(block, bg="#f0f7ff")
+            right_col.pack(side="left", fill="both", expand=True, padx=(0,8))
+            tk.Label(right_col, text="Parts 16-30", bg="#f0f7ff", font=("Arial", 11, "bold")).pack(anchor="w")
+            
+            # Left column (numbers 1..15)
+            left_col = tk.Frame(block, bg="#f0f7ff")
+            left_col.pack(side="left", fill="both", expand=True, padx=(8,0))
+            tk.Label(left_col, text="Parts 1-15", bg="#f0f7ff", font=("Arial", 11, "bold")).pack(anchor="w")
+            
+            for part in range(min(PARTS_PER_PAGE, entry_count - block_start)):
+                row = tk.Frame(left_col if part < ROWS_PER_COLUMN else right_col, bg="#f0f7ff")
+                row.pack(fill="x", pady=2)
+                tk.Label(row, text=str(part + 1), width=4, anchor="e", bg="#f0f7ff", font=("Arial", 11))\
+                    .pack(side="left")
+                entry = tk.Entry(row, font=("Arial", 12))
+                entry.pack(side="left", fill="x", expand=True, padx=(6,0))
+                entry.bind("<KeyRelease>", self.auto_save_names)
+                self.name_entries.append(entry)
         
         # Initialize with names for the preview date
+        self.preview_shown = False  # Date currently previewed (None = invalid date, False = nothing yet)
         self.update_names_order()
         
         # Color selection frame
@@ -304,9 +159,25 @@ class NamesDateApp(tk.Tk):
         button_frame = tk.Frame(self, bg="#a4ccfe")
         button_frame.grid(row=3, column=0, columnspan=2, sticky="ew", padx=10, pady=10)
         
-        tk.Button(button_frame, text="Generate PDFs for Date Range", bg="#28a745", fg="white",
-                 font=("Arial", 14, "bold"), command=self.generate_pdfs)\
-            .pack(side="left", padx=20, pady=10)
+        self.generate_button = tk.Button(button_frame, text="Generate PDFs for Date Range", bg="#28a745", fg="white",
+                                        font=("Arial", 14, "bold"), command=self.generate_pdfs)
+        self.generate_button.grid(row=0, column=0, padx=20, pady=10)
+        
+        self.cancel_button = tk.Button(button_frame, text="Cancel", bg="#dc3545", fg="white",
+                                      font=("Arial", 12, "bold"), state="disabled", command=self.cancel_generation)
+        self.cancel_button.grid(row=0, column=1, padx=5, pady=10)
+        
+        self.output_mode_var = tk.StringVar(value=next(iter(OUTPUT_MODES)))
+        ttk.Combobox(button_frame, textvariable=self.output_mode_var, values=list(OUTPUT_MODES),
+                     state="readonly", width=30, font=("Arial", 11))\
+            .grid(row=0, column=2, padx=10, pady=10, sticky="w")
+        
+        # Progress of a running generation
+        self.progress_bar = ttk.Progressbar(button_frame, orient="horizontal", mode="determinate")
+        self.progress_bar.grid(row=1, column=0, columnspan=3, sticky="ew", padx=20, pady=(0, 5))
+        self.progress_label = tk.Label(button_frame, text="", bg="#a4ccfe", font=("Arial", 11))
+        self.progress_label.grid(row=2, column=0, columnspan=3, sticky="w", padx=20, pady=(0, 10))
+        button_frame.grid_columnconfigure(2, weight=1)
         
         self.grid_columnconfigure(0, weight=1)
         self.grid_columnconfigure(1, weight=2)
@@ -315,55 +186,50 @@ class NamesDateApp(tk.Tk):
     def update_names_order(self, event=None):
         try:
             preview_date = datetime.strptime(self.preview_date_entry.get().strip(), "%Y/%m/%d")
+        except ValueError:
+            preview_date = None
+        # Typing that doesn't change the parsed date (or keeps it invalid) has nothing to redraw
+        if preview_date == self.preview_shown:
+            return
+        self.preview_shown = preview_date
+        
+        if preview_date is None:
+            self.names_header.config(text="Edit the names (invalid preview date - showing today's order):")
+        else:
             day_num = days_since_start(START_DATE, preview_date)
-            rotated_names = rotate_list(self.original_names, day_num)
-            
             self.names_header.config(text=f"Names order for {preview_date.strftime('%Y/%m/%d')} (Day {day_num}):")
-            
-            for entry in self.left_entries + self.right_entries:
-                entry.delete(0, tk.END)
-            
-            for i in range(15):
-                if i < len(rotated_names):
-                    self.left_entries[i].insert(0, rotated_names[i])
-                if i + 15 < len(rotated_names):
-                    self.right_entries[i].insert(0, rotated_names[i + 15])
+        self.names_saver.flush()  # Edits still waiting belong to the previous date
+        self.original_names = list(names_on(self.roster, self.edit_date()))
+        self.show_names(self.original_names)
+    
+    def edit_date(self):
+        # The date edits take effect: the preview date, or today when it is invalid
+        try:
+            return datetime.strptime(self.preview_date_entry.get().strip(), "%Y/%m/%d")
         except ValueError:
-            self.names_header.config(text="Edit the names (invalid preview date - showing original order):")
-            for entry in self.left_entries + self.right_entries:
+            return datetime.combine(datetime.now().date(), datetime.min.time())
+    
+    def show_names(self, names):
+        # Only touch entries whose text differs, redrawing every entry is what makes typing lag
+        for i, entry in enumerate(self.name_entries):
+            text = names[i] if i < len(names) else ""
+            if entry.get() != text:
                 entry.delete(0, tk.END)
-            for i in range(15):
-                if i < len(self.original_names):
-                    self.left_entries[i].insert(0, self.original_names[i])
-                if i + 15 < len(self.original_names):
-                    self.right_entries[i].insert(0, self.original_names[i + 15])
+                entry.insert(0, text)
     
     def auto_save_names(self, event=None):
-        try:
-            preview_date = datetime.strptime(self.preview_date_entry.get().strip(), "%Y/%m/%d")
-            day_num = days_since_start(START_DATE, preview_date)
-            
-            current_rotated_names = []
-            for entry in self.left_entries:
-                current_rotated_names.append(entry.get().strip())
-            for entry in self.right_entries:
-                current_rotated_names.append(entry.get().strip())
-            
-            if len(current_rotated_names) == 30:
-                reverse_rotation = -day_num % 30
-                original_order = rotate_list(current_rotated_names, reverse_rotation)
-                self.original_names = original_order
-                save_names(original_order)
-        except ValueError:
-            names_list = []
-            for entry in self.left_entries:
-                names_list.append(entry.get().strip())
-            for entry in self.right_entries:
-                names_list.append(entry.get().strip())
-            
-            if len(names_list) == 30:
-                self.original_names = names_list
-                save_names(names_list)
+        # Saved as the roster from the preview date on; earlier dates keep theirs
+        # Entries left blank are not part of the roster (a shorter version
+        # than the widest one leaves the last ones empty)
+        names_list = [name for name in (entry.get().strip() for entry in self.name_entries) if name]
+        self.original_names = names_list
+        if names_list:
+            self.names_saver.save(names_list, self.edit_date())
+    
+    def on_close(self):
+        # Write any edits still waiting out the save delay
+        self.names_saver.flush()
+        self.destroy()
     
     def choose_color(self, color_var, btn=None):
         color_code = colorchooser.askcolor(title="Choose Color")[1]
@@ -391,26 +257,125 @@ class NamesDateApp(tk.Tk):
             messagebox.showerror("Date Error", "Start date must be before or equal to end date.")
             return
         
-        if len(self.original_names) != 30 or any(not name.strip() for name in self.original_names):
-            messagebox.showerror("Invalid Names", "Please ensure all 30 names are filled.")
+        if not self.original_names:
+            messagebox.showerror("Invalid Names", "Please enter at least one name.")
             return
         
         colors = {key: var.get() for key, var in self.color_vars.items()}
-        current_date = start_date
-        generated = 0
-        
-        while current_date <= end_date:
-            day_num = days_since_start(START_DATE, current_date)
-            rotated_names = rotate_list(self.original_names, day_num)
-            date_str = current_date.strftime("%m-%d")
-            pdf_filename = f"{date_str}.pdf"
-            pdf_path = os.path.join(folder_path, pdf_filename)
-            generate_pdf(rotated_names, day_num, current_date, pdf_path, colors)
-            current_date += timedelta(days=1)
-            generated += 1
+        self.names_saver.flush()  # Generation reads the roster versions from roster.db
+        
+        # Generation runs on a background thread and reports through a queue,
+        # so the window stays responsive and can be cancelled
+        self.cancel_event = threading.Event()
+        self.progress_queue = queue.Queue()
+        self.generation_started = time.perf_counter()
+        self.generate_button.config(state="disabled")
+        self.cancel_button.config(state="normal")
+        self.progress_bar["value"] = 0
+        self.progress_label.config(text="Starting...")
+        threading.Thread(target=self.run_generation, daemon=True,
+                         args=(self.roster, start_date, end_date, colors,
+                               OUTPUT_MODES[self.output_mode_var.get()])).start()
+        self.after(100, self.poll_generation)
+    
+    def run_generation(self, names, start_date, end_date, colors, output_mode):
+        # Background thread: never touches widgets, only the queue. With
+        # PROFILE_STAGES on, progress also carries the stage breakdown so far.
+        profile = {} if PROFILE_STAGES else None
+        def report(done, total):
+            self.progress_queue.put(("progress", done, total, format_profile(profile)))
+        try:
+            if output_mode == "document":
+                pdf_path = os.path.join(folder_path, document_filename(start_date, end_date))
+                pages = generate_pdf_document(names, start_date, end_date, pdf_path, colors,
+                                              progress=report, cancel=self.cancel_event, profile=profile)
+                result = ("document", pages, pdf_path)
+            elif output_mode == "archive":
+                zip_path = os.path.join(folder_path, archive_filename(start_date, end_date))
+                written, failures = generate_pdf_archive(names, start_date, end_date, zip_path, colors,
+                                                         progress=report, cancel=self.cancel_event, profile=profile)
+                result = ("archive", written, failures, zip_path)
+            else:
+                result = ("range",) + generate_pdf_range(names, start_date, end_date, folder_path, colors,
+                                                         progress=report, cancel=self.cancel_event, profile=profile)
+        except Exception as e:
+            result = ("error", str(e))
+        self.progress_queue.put(("done", result, start_date, end_date, format_profile(profile)))
+    
+    def poll_generation(self):
+        try:
+            while True:
+                message = self.progress_queue.get_nowait()
+                if message[0] == "done":
+                    self.finish_generation(*message[1:4])
+                    self.show_breakdown(message[4])
+                    return
+                done, total, breakdown = message[1:]
+                self.progress_bar["maximum"] = total
+                self.progress_bar["value"] = done
+                text = format_progress(done, total, time.perf_counter() - self.generation_started)
+                self.progress_label.config(text=f"{text}\n{breakdown}" if breakdown else text)
+        except queue.Empty:
+            pass
+        self.after(100, self.poll_generation)
+    
+    def show_breakdown(self, breakdown):
+        # Final stage breakdown of a profiled run, under the result
+        if breakdown:
+            self.progress_label.config(text=f"{self.progress_label.cget('text')}\n{breakdown}")
+    
+    def cancel_generation(self):
+        self.cancel_event.set()
+        self.cancel_button.config(state="disabled")
+        self.progress_label.config(text="Cancelling after the current file...")
+    
+    def finish_generation(self, result, start_date, end_date):
+        self.generate_button.config(state="normal")
+        self.cancel_button.config(state="disabled")
+        cancelled = self.cancel_event.is_set()
+        
+        if result[0] == "error":
+            self.progress_label.config(text="Failed")
+            messagebox.showerror("PDF Generation", f"Generation failed:\n{result[1]}")
+            return
+        
+        if result[0] == "document":
+            pages, pdf_path = result[1:]
+            if not pages:  # A cancel that came in after the last day still wrote the document
+                self.progress_label.config(text="Cancelled - no document written")
+                return
+            self.progress_label.config(text=f"Done - {pages} pages")
+            messagebox.showinfo("PDF Generation", f"Generated one PDF with {pages} pages:\n{pdf_path}")
+            return
+        
+        if result[0] == "archive":
+            written, failures, zip_path = result[1:]
+            if not os.path.exists(zip_path):
+                self.progress_label.config(text="Cancelled - no archive written")
+                return
+            self.progress_label.config(text=f"Done - {written} PDFs archived")
+            if failures:
+                failed_lines = "\n".join(f"{date.strftime('%Y/%m/%d')}: {error}" for date, error in failures[:10])
+                messagebox.showwarning("PDF Generation",
+                                      f"Archived {written} PDFs, {len(failures)} failed:\n{failed_lines}")
+                return
+            messagebox.showinfo("PDF Generation", f"Archived {written} PDFs in one ZIP:\n{zip_path}")
+            return
+        
+        generated, skipped, failures = result[1:]
+        self.progress_label.config(text=f"{'Cancelled' if cancelled else 'Done'} - {generated} PDFs generated")
+        if cancelled:
+            messagebox.showinfo("PDF Generation", f"Cancelled after generating {generated} PDFs in folder:\n{folder_path}")
+            return
+        
+        if failures:
+            failed_lines = "\n".join(f"{date.strftime('%Y/%m/%d')}: {error}" for date, error in failures[:10])
+            messagebox.showwarning("PDF Generation", 
+                                  f"Generated {generated} PDFs, {len(failures)} failed:\n{failed_lines}")
+            return
         
         messagebox.showinfo("PDF Generation", 
-                           f"Generated {generated} PDFs for dates from {start_date.strftime('%Y/%m/%d')} to {end_date.strftime('%Y/%m/%d')} in folder:\n{folder_path}")
+                           f"Generated {generated} PDFs ({skipped} unchanged, skipped) for dates from {start_date.strftime('%Y/%m/%d')} to {end_date.strftime('%Y/%m/%d')} in folder:\n{folder_path}")
 
 # ========================================
 # RUN
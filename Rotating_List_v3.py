@@ -1,171 +1,31 @@
 """
 Quran Parts PDF Generator - v3 (English/Arabic Toggle)
-Creates daily PDF schedules for 30 people rotating through Quran Juz' assignments.
-Toggle USE_ARABIC = True/False at the top for language choice.
+Creates daily PDF schedules for people rotating through Quran Juz' assignments
+(30 per khatma; larger rosters get one page per khatma).
+Toggle USE_ARABIC = True/False at the top of Rotating_List_engine.py for language choice.
 """
 
 import os
-from datetime import datetime, timedelta
-from fpdf import FPDF
+import queue
+import threading
+import time
+from datetime import datetime
 import customtkinter as ctk
 from tkinter import messagebox, colorchooser
 import tkinter as tk
+from Rotating_List_engine import (
+    USE_ARABIC, START_DATE, PARTS_PER_PAGE, ROWS_PER_COLUMN, folder_path, get_roster_store, names_on,
+    NamesSaver, days_since_start, generate_pdf_range, generate_pdf_document, document_filename,
+    generate_pdf_archive, archive_filename,
+    PROFILE_STAGES, format_progress, format_profile
+)
 
-# ========================================
-# TOGGLE LANGUAGE SUPPORT HERE
-USE_ARABIC = False  # Set True for Arabic names/headers (requires extra pip installs)
-
-# ========================================
-# CONFIGURATION
-FONT_PATH = r"C:\Windows\Fonts\arial.ttf"  # Change to MAJALLA.TTF for Arabic
-START_DATE = datetime(2025, 8, 16)
-desktop_path = os.path.join(os.path.expanduser("~"), "Desktop")
-folder_name = "Parts"  # Changed from Arabic "اجزاء"
-folder_path = os.path.join(desktop_path, folder_name)
-os.makedirs(folder_path, exist_ok=True)
-names_file = os.path.join(folder_path, "names.txt")
-
-# Language content
-if USE_ARABIC:
-    # Requires: pip install arabic-reshaper python-bidi
-    import arabic_reshaper
-    from bidi.algorithm import get_display
-    
-    HEADERS = ["رقم الجزء", "الاسم", "رقم الجزء", "الاسم"]
-    DAYS_ARABIC = {
-        "Monday": "الاثنين", "Tuesday": "الثلاثاء", "Wednesday": "الأربعاء",
-        "Thursday": "الخميس", "Friday": "الجمعة", "Saturday": "السبت", "Sunday": "الأحد"
-    }
-    DEFAULT_NAMES = [
-        "عبدالله", "فاطمة", "أحمد", "مريم", "عمر", "زينب", "خالد", "نور", "يوسف", "سارة",
-        "إبراهيم", "عائشة", "محمود", "ليلى", "حسن", "رقية", "علي", "سمية", "مصطفى", "هدى",
-        "بشرى", "سلمى", "عبدالرحمن", "أسماء", "طارق", "نادية", "فيصل", "منى", "سعيد", "جميلة"
-    ]
-
-    
-    def reshape_arabic(text):
-        reshaped = arabic_reshaper.reshape(text)
-        return get_display(reshaped)
-else:
-    HEADERS = ["Part #", "Name", "Part #", "Name"]
-    DAYS_ARABIC = {}
-    DEFAULT_NAMES = [
-        "Nathan", "Michael", "Taylor", "Jessica", "Alex", "Sarah", "David", "Emily", 
-        "James", "Olivia", "Sarah", "David", "Michael", "Andrew", "Henry", 
-        "Bella", "Rachel", "Samuel", "Oliver", "Mia", "Riley", "Isaac", 
-        "Noah James", "Sophia", "Russell", "Nora", "Susan", "Noah Andrew", "Amy", "Oscar"
-    ]
-    def reshape_arabic(text):
-        return text
-
-# ========================================
-# HELPERS
-def load_names():
-    if os.path.exists(names_file):
-        with open(names_file, "r", encoding="utf-8") as f:
-            return [line.strip() for line in f if line.strip()]
-    return DEFAULT_NAMES.copy()
-
-def save_names(names_list):
-    with open(names_file, "w", encoding="utf-8") as f:
-        for name in names_list:
-            f.write(name + "\n")
-
-def days_since_start(start_date, current_date):
-    delta = current_date.date() - start_date.date()
-    return delta.days if delta.days >= 0 else 0
-
-def rotate_list(lst, n):
-    n = n % len(lst)
-    return lst[-n:] + lst[:-n]
-
-def hex_to_rgb(hex_color):
-    hex_color = (hex_color or "#000000").lstrip("#")
-    return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
-
-def get_day_name(date):
-    day_english = date.strftime("%A")
-    return DAYS_ARABIC.get(day_english, day_english)
-
-# ========================================
-# PDF GENERATION
-class PDF(FPDF):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.add_font('Arial', '', FONT_PATH, uni=True)
-        self.add_font('Arial', 'B', FONT_PATH, uni=True)
-
-def generate_pdf(names, day_num, date, filename, colors):
-    pdf = PDF()
-    pdf.set_margins(5, 5, 5)
-    pdf.add_page()
-    
-    # Header with date and day name
-    pdf.set_font("Arial", 'B', 38)
-    header_text = f"{date.strftime('%Y/%m/%d')} {get_day_name(date)}"
-    pdf.cell(0, 15, reshape_arabic(header_text), ln=1, align='C')
-    pdf.ln(5)
-    
-    # Table setup
-    col_name_w, col_num_w, row_h = 75, 20, 15
-    
-    # Header row
-    header_fill_rgb = hex_to_rgb(colors.get("header_fill"))
-    header_text_rgb = hex_to_rgb(colors.get("header_text"))
-    border_rgb = hex_to_rgb(colors.get("borders"))
-    
-    pdf.set_draw_color(*border_rgb)
-    pdf.set_fill_color(*header_fill_rgb)
-    pdf.set_text_color(*header_text_rgb)
-    pdf.set_line_width(1.2)
-    pdf.set_font("Arial", 'B', 16)
-    
-    for header in HEADERS:
-        pdf.cell(col_num_w if "رقم" in header or "Part" in header else col_name_w, 
-                row_h, reshape_arabic(header), border=1, align='C', fill=True)
-    pdf.ln()
-    
-    # Data rows
-    row1_rgb = hex_to_rgb(colors.get("row_bg1"))
-    row2_rgb = hex_to_rgb(colors.get("row_bg2"))
-    text_rgb = hex_to_rgb(colors.get("text"))
-    numbers_rgb = hex_to_rgb(colors.get("numbers"))
-    names_bg_rgb = hex_to_rgb(colors.get("names_bg"))
-    
-    pdf.set_draw_color(*border_rgb)
-    pdf.set_line_width(1.2)
-    
-    half = len(names) // 2
-    numbers_left, numbers_right = list(range(1, 16)), list(range(16, 31))
-    right_names, left_names = names[half:], names[:half]
-    
-    for i in range(half):
-        row_fill = row1_rgb if i % 2 == 0 else row2_rgb
-        
-        # Right column number
-        pdf.set_fill_color(*row_fill)
-        pdf.set_text_color(*numbers_rgb)
-        pdf.set_font("Arial", 'B', 28)
-        pdf.cell(col_num_w, row_h, str(numbers_right[i]), border=1, align='C', fill=True)
-        
-        # Right column name
-        pdf.set_fill_color(*names_bg_rgb)
-        pdf.set_text_color(*text_rgb)
-        pdf.cell(col_name_w, row_h, reshape_arabic(right_names[i]), border=1, align='C', fill=True)
-        
-        # Left column number
-        pdf.set_fill_color(*row_fill)
-        pdf.set_text_color(*numbers_rgb)
-        pdf.cell(col_num_w, row_h, str(numbers_left[i]), border=1, align='C', fill=True)
-        
-        # Left column name
-        pdf.set_fill_color(*names_bg_rgb)
-        pdf.set_text_color(*text_rgb)
-        pdf.cell(col_name_w, row_h, reshape_arabic(left_names[i]), border=1, align='C', fill=True)
-        
-        pdf.ln()
-    
-    pdf.output(filename)
+# What the Generate button writes, by menu label
+OUTPUT_MODES = {
+    "📄 Separate PDFs (MM-DD.pdf)": "files",
+    "📚 One multi-page PDF": "document",
+    "🗜️ One ZIP archive": "archive",
+}
 
 # ========================================
 # MODERN GUI
@@ -220,43 +80,46 @@ class PartsApp(ctk.CTk):
                                         font=ctk.CTkFont(size=16, weight="bold"))
         self.names_header.pack(pady=8)
         
-        self.original_names = load_names()
-        self.left_entries = []
-        self.right_entries = []
+        # Roster versions by effective date; edits apply from the preview date on
+        self.roster = get_roster_store()
+        self.original_names = list(names_on(self.roster, self.edit_date()))
+        self.names_saver = NamesSaver()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.name_entries = []  # indexed like the names: parts 1-30 of each khatma in turn
+        entry_count = max((len(names) for _, names, _ in self.roster.versions()), default=PARTS_PER_PAGE)
         
-        cols_frame = ctk.CTkFrame(names_frame)
+        # Scrollable, so larger rosters get one block of parts 1-30 per khatma
+        cols_frame = ctk.CTkScrollableFrame(names_frame)
         cols_frame.pack(fill="both", expand=True, padx=6, pady=6)
         
-        # Right column (16-30)
-        right_col = ctk.CTkFrame(cols_frame)
-        right_col.pack(side="left", fill="both", expand=True, padx=(5, 10))
-        ctk.CTkLabel(right_col, text="Parts 16-30", font=ctk.CTkFont(size=14, weight="bold")).pack()
-        
-        # Left column (1-15)
-        left_col = ctk.CTkFrame(cols_frame)
-        left_col.pack(side="left", fill="both", expand=True, padx=(10, 5))
-        ctk.CTkLabel(left_col, text="Parts 1-15", font=ctk.CTkFont(size=14, weight="bold")).pack()
-        
-        # Create name entry fields
-        for i in range(15):
-            # Left column (1-15)
-            l_row = ctk.CTkFrame(left_col)
-            l_row.pack(fill="x", pady=2)
-            ctk.CTkLabel(l_row, text=str(i+1), width=30).pack(side="left")
-            ent_l = ctk.CTkEntry(l_row)
-            ent_l.pack(side="left", fill="x", expand=True, padx=4)
-            ent_l.bind("<KeyRelease>", self.auto_save_names)
-            self.left_entries.append(ent_l)
+        for block_start in range(0, entry_count, PARTS_PER_PAGE):
+            if entry_count > PARTS_PER_PAGE:
+                ctk.CTkLabel(cols_frame, text=f"📖 Khatma {block_start // PARTS_PER_PAGE + 1}",
+                            font=ctk.CTkFont(size=15, weight="bold")).pack(anchor="w", padx=5)
+            block = ctk.CTkFrame(cols_frame)
+            block.pack(fill="x", pady=(0, 8))
             
             # Right column (16-30)
-            r_row = ctk.CTkFrame(right_col)
-            r_row.pack(fill="x", pady=2)
-            ctk.CTkLabel(r_row, text=str(i+16), width=30).pack(side="left")
-            ent_r = ctk.CTkEntry(r_row)
-            ent_r.pack(side="left", fill="x", expand=True, padx=4)
-            ent_r.bind("<KeyRelease>", self.auto_save_names)
-            self.right_entries.append(ent_r)
-        
+            right_col = ctk.CTkFrame(block)
+            right_col.pack(side="left", fill="both", expand=True, padx=(5, 10))
+            ctk.CTkLabel(right_col, text="Parts 16-30", font=ctk.CTkFont(size=14, weight="bold")).pack()
+            
+            # Left column (1-15)
+            left_col = ctk.CTkFrame(block)
+            left_col.pack(side="left", fill="both", expand=True, padx=(10, 5))
+            ctk.CTkLabel(left_col, text="Parts 1-15", font=ctk.CTkFont(size=14, weight="bold")).pack()
+            
+            # Create name entry fields
+            for part in range(min(PARTS_PER_PAGE, entry_count - block_start)):
+                row = ctk.CTkFrame(left_col if part < ROWS_PER_COLUMN else right_col)
+                row.pack(fill="x", pady=2)
+                ctk.CTkLabel(row, text=str(part + 1), width=30).pack(side="left")
+                entry = ctk.CTkEntry(row)
+                entry.pack(side="left", fill="x", expand=True, padx=4)
+                entry.bind("<KeyRelease>", self.auto_save_names)
+                self.name_entries.append(entry)
+        
+        self.preview_shown = False  # Date currently previewed (None = invalid date, False = nothing yet)
         self.update_names_order()
         
         # Color Frame
@@ -307,9 +170,26 @@ class PartsApp(ctk.CTk):
         btn_frame = ctk.CTkFrame(self)
         btn_frame.grid(row=3, column=0, columnspan=2, padx=10, pady=15, sticky="ew")
         
-        ctk.CTkButton(btn_frame, text="🚀 Generate PDFs", font=ctk.CTkFont(size=20, weight="bold"),
-                     height=50, command=self.generate_pdfs)\
-          .pack(pady=15, padx=20, fill="x")
+        self.generate_button = ctk.CTkButton(btn_frame, text="🚀 Generate PDFs", font=ctk.CTkFont(size=20, weight="bold"),
+                                             height=50, command=self.generate_pdfs)
+        self.generate_button.pack(pady=15, padx=20, fill="x")
+        
+        # Progress of a running generation
+        self.progress_bar = ctk.CTkProgressBar(btn_frame)
+        self.progress_bar.set(0)
+        self.progress_bar.pack(pady=(0, 5), padx=20, fill="x")
+        
+        progress_row = ctk.CTkFrame(btn_frame, fg_color="transparent")
+        progress_row.pack(pady=(0, 10), padx=20, fill="x")
+        self.progress_label = ctk.CTkLabel(progress_row, text="")
+        self.progress_label.pack(side="left")
+        self.cancel_button = ctk.CTkButton(progress_row, text="✖ Cancel", width=100, fg_color="#dc3545",
+                                           hover_color="#a71d2a", state="disabled", command=self.cancel_generation)
+        self.cancel_button.pack(side="right")
+        
+        self.output_mode_var = tk.StringVar(value=next(iter(OUTPUT_MODES)))
+        ctk.CTkOptionMenu(btn_frame, values=list(OUTPUT_MODES), variable=self.output_mode_var, width=260)\
+          .pack(pady=(0, 15), padx=20, anchor="w")
         
         self.grid_columnconfigure(0, weight=1)
         self.grid_columnconfigure(1, weight=2)
@@ -319,36 +199,50 @@ class PartsApp(ctk.CTk):
     def update_names_order(self, event=None):
         try:
             preview_date = datetime.strptime(self.preview_date_entry.get().strip(), "%Y/%m/%d")
+        except ValueError:
+            preview_date = None
+        # Same parsed date (or still invalid) -> same rotation, nothing to redraw
+        if preview_date == self.preview_shown:
+            return
+        self.preview_shown = preview_date
+        
+        if preview_date is None:
+            self.names_header.configure(text="Invalid date - showing today's order:")
+        else:
             day_num = days_since_start(START_DATE, preview_date)
-            rotated_names = rotate_list(self.original_names, day_num)
             self.names_header.configure(text=f"Preview for {preview_date.strftime('%Y/%m/%d')} (Day {day_num}):")
-            
-            for entry in self.left_entries + self.right_entries:
+        self.names_saver.flush()  # Edits still waiting belong to the previous date
+        self.original_names = list(names_on(self.roster, self.edit_date()))
+        self.show_names(self.original_names)
+    
+    def edit_date(self):
+        # The date edits take effect: the preview date, or today when it is invalid
+        try:
+            return datetime.strptime(self.preview_date_entry.get().strip(), "%Y/%m/%d")
+        except ValueError:
+            return datetime.combine(datetime.now().date(), datetime.min.time())
+    
+    def show_names(self, names):
+        # Redrawing a CTkEntry is slow, so only rewrite the ones that changed
+        for i, entry in enumerate(self.name_entries):
+            text = names[i] if i < len(names) else ""
+            if entry.get() != text:
                 entry.delete(0, "end")
-            for i in range(15):
-                if i < len(rotated_names):
-                    self.left_entries[i].insert(0, rotated_names[i])
-                if i + 15 < len(rotated_names):
-                    self.right_entries[i].insert(0, rotated_names[i + 15])
-        except:
-            self.names_header.configure(text="Invalid date - showing original order:")
-            for i, entry in enumerate(self.left_entries + self.right_entries):
-                if i < len(self.original_names):
-                    entry.delete(0, "end")
-                    entry.insert(0, self.original_names[i])
+                entry.insert(0, text)
     
     def auto_save_names(self, event=None):
-        try:
-            preview_date = datetime.strptime(self.preview_date_entry.get().strip(), "%Y/%m/%d")
-            day_num = days_since_start(START_DATE, preview_date)
-            rotated = [e.get().strip() for e in self.left_entries + self.right_entries]
-            if len(rotated) == 30:
-                reverse_rotation = -day_num % 30
-                original = rotate_list(rotated, reverse_rotation)
-                self.original_names = original
-                save_names(original)
-        except:
-            pass
+        # Saved as the roster from the preview date on; earlier dates keep theirs
+        # Entries left blank are not part of the roster (a shorter version
+        # than the widest one leaves the last ones empty)
+        names = [name for name in (e.get().strip() for e in self.name_entries) if name]
+        self.original_names = names
+        if names:
+            self.names_saver.save(names, self.edit_date())
+    
+    def on_close(self):
+        # Write any edits still waiting out the save delay
+        self.names_saver.flush()
+        self.destroy()
     
     def choose_color(self, color_var, button):
         color_code = colorchooser.askcolor(title="Choose Color")[1]
@@ -371,24 +265,125 @@ class PartsApp(ctk.CTk):
             messagebox.showerror("Error", "Start date must be before end date")
             return
         
-        if len(self.original_names) != 30 or any(not n.strip() for n in self.original_names):
-            messagebox.showerror("Error", "Please fill all 30 names")
+        if not self.original_names:
+            messagebox.showerror("Error", "Please enter at least one name")
             return
         
         colors = {k: v.get() for k, v in self.color_vars.items()}
-        current = start_date
-        generated = 0
+        self.names_saver.flush()  # Generation reads the roster versions from roster.db
+        
+        # Generation runs on a background thread and reports through a queue,
+        # so the window stays responsive and can be cancelled
+        self.cancel_event = threading.Event()
+        self.progress_queue = queue.Queue()
+        self.generation_started = time.perf_counter()
+        self.generate_button.configure(state="disabled")
+        self.cancel_button.configure(state="normal")
+        self.progress_bar.set(0)
+        self.progress_label.configure(text="Starting...")
+        threading.Thread(target=self.run_generation, daemon=True,
+                         args=(self.roster, start_date, end_date, colors,
+                               OUTPUT_MODES[self.output_mode_var.get()])).start()
+        self.after(100, self.poll_generation)
+    
+    def run_generation(self, names, start_date, end_date, colors, output_mode):
+        # Background thread: never touches widgets, only the queue. With
+        # PROFILE_STAGES on, progress also carries the stage breakdown so far.
+        profile = {} if PROFILE_STAGES else None
+        def report(done, total):
+            self.progress_queue.put(("progress", done, total, format_profile(profile)))
+        try:
+            if output_mode == "document":
+                filename = os.path.join(folder_path, document_filename(start_date, end_date))
+                pages = generate_pdf_document(names, start_date, end_date, filename, colors,
+                                              progress=report, cancel=self.cancel_event, profile=profile)
+                result = ("document", pages, filename)
+            elif output_mode == "archive":
+                filename = os.path.join(folder_path, archive_filename(start_date, end_date))
+                written, failures = generate_pdf_archive(names, start_date, end_date, filename, colors,
+                                                         progress=report, cancel=self.cancel_event, profile=profile)
+                result = ("archive", written, failures, filename)
+            else:
+                result = ("range",) + generate_pdf_range(names, start_date, end_date, folder_path, colors,
+                                                         progress=report, cancel=self.cancel_event, profile=profile)
+        except Exception as e:
+            result = ("error", str(e))
+        self.progress_queue.put(("done", result, format_profile(profile)))
+    
+    def poll_generation(self):
+        try:
+            while True:
+                message = self.progress_queue.get_nowait()
+                if message[0] == "done":
+                    self.finish_generation(message[1])
+                    self.show_breakdown(message[2])
+                    return
+                done, total, breakdown = message[1:]
+                self.progress_bar.set(done / total if total else 1)
+                text = format_progress(done, total, time.perf_counter() - self.generation_started)
+                self.progress_label.configure(text=f"{text}\n📊 {breakdown}" if breakdown else text)
+        except queue.Empty:
+            pass
+        self.after(100, self.poll_generation)
+    
+    def show_breakdown(self, breakdown):
+        # Final stage breakdown of a profiled run, under the result
+        if breakdown:
+            self.progress_label.configure(text=f"{self.progress_label.cget('text')}\n📊 {breakdown}")
+    
+    def cancel_generation(self):
+        self.cancel_event.set()
+        self.cancel_button.configure(state="disabled")
+        self.progress_label.configure(text="⏳ Cancelling after the current file...")
+    
+    def finish_generation(self, result):
+        self.generate_button.configure(state="normal")
+        self.cancel_button.configure(state="disabled")
+        cancelled = self.cancel_event.is_set()
+        
+        if result[0] == "error":
+            self.progress_label.configure(text="❌ Failed")
+            messagebox.showerror("Error", f"❌ Generation failed:\n{result[1]}")
+            return
+        
+        if result[0] == "document":
+            pages, filename = result[1:]
+            if not pages:  # A cancel that came in after the last day still wrote the document
+                self.progress_label.configure(text="✖ Cancelled - no document written")
+                return
+            self.progress_label.configure(text=f"✅ Done - {pages} pages")
+            messagebox.showinfo("Success", f"✅ Generated one PDF with {pages} pages:\n{filename}")
+            return
+        
+        if result[0] == "archive":
+            written, failures, filename = result[1:]
+            if not os.path.exists(filename):
+                self.progress_label.configure(text="✖ Cancelled - no archive written")
+                return
+            self.progress_label.configure(text=f"✅ Done - {written} PDFs archived")
+            if failures:
+                failed_lines = "\n".join(f"{d.strftime('%Y/%m/%d')}: {err}" for d, err in failures[:10])
+                messagebox.showwarning("Partial Success",
+                                      f"⚠️ Archived {written} PDFs, {len(failures)} failed:\n{failed_lines}")
+                return
+            messagebox.showinfo("Success", f"✅ Archived {written} PDFs in one ZIP:\n{filename}")
+            return
+        
+        generated, skipped, failures = result[1:]
+        if cancelled:
+            self.progress_label.configure(text=f"✖ Cancelled - {generated} PDFs generated")
+            messagebox.showinfo("Cancelled", f"✖ Cancelled after generating {generated} PDFs in:\n{folder_path}")
+            return
+        self.progress_label.configure(text=f"✅ Done - {generated} PDFs generated")
         
-        while current <= end_date:
-            day_num = days_since_start(START_DATE, current)
-            rotated = rotate_list(self.original_names, day_num)
-            filename = os.path.join(folder_path, f"{current.strftime('%m-%d')}.pdf")
-            generate_pdf(rotated, day_num, current, filename, colors)
-            current += timedelta(days=1)
-            generated += 1
+        if failures:
+            failed_lines = "\n".join(f"{d.strftime('%Y/%m/%d')}: {err}" for d, err in failures[:10])
+            messagebox.showwarning("Partial Success", 
+                                  f"⚠️ Generated {generated} PDFs, {len(failures)} failed:\n{failed_lines}")
+            return
         
         messagebox.showinfo("Success", 
-                           f"✅ Generated {generated} PDFs in:\n{folder_path}")
+                           f"✅ Generated {generated} PDFs ({skipped} unchanged) in:\n{folder_path}")
 
 if __name__ == "__main__":
     print("📄 Quran Parts PDF Generator")
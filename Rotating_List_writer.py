@@ -0,0 +1,186 @@
+"""
+Quran Parts PDF Generator - streaming PDF writer
+Writes a PDF page by page straight to a file: each page is flushed as soon as
+it is added and only object offsets stay in memory. All pages share a single
+embedded font subset and resource dictionary, written once when the file closes.
+Content repeated across pages can be written once as a form XObject.
+"""
+
+import zlib
+from io import BytesIO
+from fontTools import subset as ftsubset
+from fontTools import ttLib
+
+# ========================================
+# PAGE GEOMETRY (A4)
+K = 72 / 25.4  # points per millimetre, FPDF's default unit
+PAGE_W, PAGE_H = 595.28, 841.89
+
+PAGES_ID, FONT_ID, RESOURCES_ID = 1, 2, 3
+
+# Subset font programs by (font bytes, hinting, glyph ids): documents using
+# the same glyphs, like a run of daily schedules, subset the font only once
+FONT_PROGRAM_CACHE_LIMIT = 64
+_font_programs = {}
+
+# ========================================
+# WRITER
+class StreamingPDFWriter:
+    def __init__(self, file, font, font_bytes, compress=True, hinting=True):
+        # font is a parsed fpdf TTFFont (see get_cached_font): its cmap, widths
+        # and descriptor are used as-is, text is encoded as glyph ids.
+        # hinting=False embeds the subset without TrueType instructions.
+        self.file = file
+        self.font = font
+        self.font_bytes = font_bytes
+        self.compress = compress
+        self.hinting = hinting
+        self.offsets = {}
+        self.next_id = RESOURCES_ID + 1
+        self.page_ids = []
+        self.form_ids = []
+        self.used_glyphs = {0: 0}  # glyph id -> unicode code point
+        self.position = 0
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def _write(self, data):
+        self.file.write(data)
+        self.position += len(data)
+
+    def _new_id(self):
+        obj_id = self.next_id
+        self.next_id += 1
+        return obj_id
+
+    def _write_object(self, obj_id, body):
+        self.offsets[obj_id] = self.position
+        self._write(f"{obj_id} 0 obj\n".encode() + body + b"\nendobj\n")
+
+    def _write_stream(self, obj_id, data, extra=""):
+        if self.compress:
+            data = zlib.compress(data)
+            extra += " /Filter /FlateDecode"
+        self._write_object(obj_id, f"<</Length {len(data)}{extra}>>\nstream\n".encode()
+                           + data + b"\nendstream")
+
+    # Text
+    def string_width(self, text, size):
+        # Width in points, the same metric FPDF uses to centre cell text
+        cw = self.font.cw
+        return sum(cw[ord(char)] for char in text) * size / 1000
+
+    def encode_text(self, text):
+        glyph_ids = self.font.glyph_ids
+        codes = []
+        for char in text:
+            gid = glyph_ids.get(ord(char))
+            if gid is None:
+                continue  # Missing from the font: FPDF drops it as well
+            self.used_glyphs.setdefault(gid, ord(char))
+            codes.append(f"{gid:04X}")
+        return f"<{''.join(codes)}>"
+
+    def reserve_text(self, text):
+        # Marks the glyphs of text as used without drawing it, so content
+        # encoded for another writer with the same font can be reused here
+        self.encode_text(text)
+
+    # Forms
+    def add_form(self, content):
+        # Returns the resource name to draw it with: "q /Name Do Q"
+        form_id = self._new_id()
+        self._write_stream(form_id, content, (
+            f" /Type /XObject /Subtype /Form /BBox [0 0 {PAGE_W:.2f} {PAGE_H:.2f}]"
+            f" /Resources <</Font <</F1 {FONT_ID} 0 R>>>>"))
+        self.form_ids.append(form_id)
+        return f"Fm{len(self.form_ids)}"
+
+    # Pages
+    def add_page(self, content):
+        content_id, page_id = self._new_id(), self._new_id()
+        self._write_stream(content_id, content)
+        self._write_object(page_id, (
+            f"<</Type /Page /Parent {PAGES_ID} 0 R /MediaBox [0 0 {PAGE_W:.2f} {PAGE_H:.2f}]"
+            f" /Resources {RESOURCES_ID} 0 R /Contents {content_id} 0 R>>").encode())
+        self.page_ids.append(page_id)
+
+    # Closing
+    def _font_program(self):
+        # The font subset to the used glyphs. Glyph ids are kept so the codes
+        # already written in pages stay valid.
+        key = (self.font_bytes, self.hinting, tuple(sorted(self.used_glyphs)))
+        program = _font_programs.get(key)
+        if program is None:
+            ttfont = ttLib.TTFont(BytesIO(self.font_bytes), recalcTimestamp=False, lazy=True)
+            options = ftsubset.Options(retain_gids=True, notdef_outline=True, recommended_glyphs=True,
+                                       hinting=self.hinting)
+            options.drop_tables += ["FFTM", "GDEF", "GPOS", "GSUB", "MATH", "hdmx", "meta"]
+            subsetter = ftsubset.Subsetter(options)
+            subsetter.populate(gids=key[2])
+            subsetter.subset(ttfont)
+            output = BytesIO()
+            ttfont.save(output)
+            program = output.getvalue()
+            if len(_font_programs) >= FONT_PROGRAM_CACHE_LIMIT:
+                _font_programs.clear()
+            _font_programs[key] = program
+        return program
+
+    def _write_font(self):
+        font = self.font
+        program = self._font_program()
+
+        font_file_id, descriptor_id, cid_font_id, to_unicode_id = (self._new_id() for _ in range(4))
+        base_font = f"RLPDFA+{font.name}"
+        self._write_stream(font_file_id, program, f" /Length1 {len(program)}")
+
+        desc = font.desc
+        self._write_object(descriptor_id, (
+            f"<</Type /FontDescriptor /FontName /{base_font} /Ascent {desc.ascent}"
+            f" /Descent {desc.descent} /CapHeight {desc.cap_height} /Flags {desc.flags.value}"
+            f" /FontBBox {desc.font_b_box} /ItalicAngle {desc.italic_angle}"
+            f" /StemV {desc.stem_v} /MissingWidth {desc.missing_width}"
+            f" /FontFile2 {font_file_id} 0 R>>").encode())
+
+        widths = " ".join(f"{gid} [{font.cw[uni]}]" for gid, uni in sorted(self.used_glyphs.items()))
+        self._write_object(cid_font_id, (
+            f"<</Type /Font /Subtype /CIDFontType2 /BaseFont /{base_font}"
+            f" /CIDSystemInfo <</Registry (Adobe) /Ordering (Identity) /Supplement 0>>"
+            f" /FontDescriptor {descriptor_id} 0 R /DW {desc.missing_width}"
+            f" /W [{widths}] /CIDToGIDMap /Identity>>").encode())
+
+        mappings = [(gid, uni) for gid, uni in sorted(self.used_glyphs.items()) if gid]
+        blocks = []
+        for start in range(0, len(mappings), 100):
+            chunk = mappings[start:start + 100]
+            lines = "\n".join(f"<{gid:04X}> <{chr(uni).encode('utf-16-be').hex().upper()}>"
+                              for gid, uni in chunk)
+            blocks.append(f"{len(chunk)} beginbfchar\n{lines}\nendbfchar")
+        cmap = ("/CIDInit /ProcSet findresource begin\n12 dict begin\nbegincmap\n"
+                "/CIDSystemInfo <</Registry (Adobe) /Ordering (UCS) /Supplement 0>> def\n"
+                "/CMapName /Adobe-Identity-UCS def\n/CMapType 2 def\n"
+                "1 begincodespacerange\n<0000> <FFFF>\nendcodespacerange\n"
+                + "\n".join(blocks) +
+                "\nendcmap\nCMapName currentdict /CMap defineresource pop\nend\nend")
+        self._write_stream(to_unicode_id, cmap.encode())
+
+        self._write_object(FONT_ID, (
+            f"<</Type /Font /Subtype /Type0 /BaseFont /{base_font} /Encoding /Identity-H"
+            f" /DescendantFonts [{cid_font_id} 0 R] /ToUnicode {to_unicode_id} 0 R>>").encode())
+
+    def close(self):
+        self._write_font()
+        forms = " ".join(f"/Fm{i} {form_id} 0 R" for i, form_id in enumerate(self.form_ids, 1))
+        self._write_object(RESOURCES_ID, (
+            f"<</Font <</F1 {FONT_ID} 0 R>> /XObject <<{forms}>> /ProcSet [/PDF /Text]>>").encode())
+        kids = " ".join(f"{page_id} 0 R" for page_id in self.page_ids)
+        self._write_object(PAGES_ID, f"<</Type /Pages /Kids [{kids}] /Count {len(self.page_ids)}>>".encode())
+        catalog_id = self._new_id()
+        self._write_object(catalog_id, f"<</Type /Catalog /Pages {PAGES_ID} 0 R>>".encode())
+
+        xref_position = self.position
+        xref = [f"xref\n0 {self.next_id}\n0000000000 65535 f \n"]
+        xref += [f"{self.offsets[obj_id]:010} 00000 n \n" for obj_id in range(1, self.next_id)]
+        self._write("".join(xref).encode())
+        self._write((f"trailer\n<</Size {self.next_id} /Root {catalog_id} 0 R>>\n"
+                     f"startxref\n{xref_position}\n%%EOF\n").encode())
@@ -0,0 +1,47 @@
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Rotating_List_engine as engine
+import Rotating_List_fonts as fonts_module
+
+@pytest.fixture
+def arabic(tmp_path, monkeypatch):
+    # Arabic mode with the font picked from the installed fonts
+    pytest.importorskip("arabic_reshaper")
+    pytest.importorskip("bidi")
+    monkeypatch.setattr(engine, "font_index_file", str(tmp_path / "font_index.json"))
+    monkeypatch.setattr(engine, "FONT_PATH", None)
+    monkeypatch.setattr(engine, "_font_files", {})
+    monkeypatch.setattr(engine, "_reshapers", {})
+    monkeypatch.setattr(engine, "shaping_cache", {})
+    assert engine.set_language(True)
+    try:
+        files = engine.font_files()
+    except ValueError:
+        engine.set_language(False)
+        pytest.skip("no Arabic font installed")
+    yield files
+    engine.set_language(False)
+
+def test_allah_ligature_is_drawn_with_the_selected_font(arabic):
+    name = "عبدالله"
+    for path in arabic:
+        glyphs = engine.get_cached_font(path)[0].glyph_ids
+        assert all(ord(char) in glyphs for char in engine.reshape_arabic(name)), path
+    names = [name] + list(engine.ARABIC_NAMES[1:])
+    assert engine.render_pdf(names, datetime(2025, 8, 16), engine.DEFAULT_COLORS).startswith(b"%PDF")
+
+def test_fonts_with_the_ligatures_are_preferred():
+    entry = {"latin": True, "italic": False, "bold": False, "style": "Regular", "arabic": 1.0}
+    index = {"dirs": [], "fonts": [
+        dict(entry, family="DejaVu Sans", path="dejavu.ttf", ligatures=False),
+        dict(entry, family="Other Naskh", path="naskh.ttf", ligatures=True),
+    ]}
+    assert fonts_module.find_font_files(index, arabic=True) == ("naskh.ttf", "naskh.ttf")
+    index["fonts"].pop()
+    assert fonts_module.find_font_files(index, arabic=True) == ("dejavu.ttf", "dejavu.ttf")
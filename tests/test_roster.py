@@ -0,0 +1,92 @@
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Rotating_List_engine as engine
+from Rotating_List_roster import RosterStore
+
+THIRTY = [f"A{i}" for i in range(30)]
+SIXTY = [f"B{i}" for i in range(60)]
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    # The engine's roster.db and names.txt, in a temp folder
+    monkeypatch.setattr(engine, "roster_db_file", str(tmp_path / "roster.db"))
+    monkeypatch.setattr(engine, "names_file", str(tmp_path / "names.txt"))
+    monkeypatch.setattr(engine, "_roster_stores", {})
+    store = engine.get_roster_store()
+    store.save_version(THIRTY, engine.START_DATE)
+    store.save_version(SIXTY, datetime(2025, 9, 1))
+    yield store
+    store.close()
+
+def test_segments_split_at_effective_dates(store):
+    segments = store.segments(datetime(2025, 8, 20), datetime(2025, 9, 10))
+    assert [(first, last, len(names), effective) for first, last, names, effective in segments] == [
+        (datetime(2025, 8, 20), datetime(2025, 8, 31), 30, engine.START_DATE),
+        (datetime(2025, 9, 1), datetime(2025, 9, 10), 60, datetime(2025, 9, 1)),
+    ]
+
+def test_segments_of_an_empty_store(tmp_path):
+    empty = RosterStore(str(tmp_path / "empty.db"))
+    with pytest.raises(ValueError):
+        empty.segments(datetime(2025, 8, 16), datetime(2025, 8, 20))
+    empty.close()
+
+def test_roster_on_an_empty_store(tmp_path):
+    empty = RosterStore(str(tmp_path / "empty.db"))
+    with pytest.raises(ValueError):
+        engine.names_on(empty, datetime(2025, 8, 16))
+    empty.close()
+
+def test_new_store_with_a_blank_names_file(tmp_path, monkeypatch):
+    # Seeded with the default names instead of failing on every call
+    monkeypatch.setattr(engine, "roster_db_file", str(tmp_path / "roster.db"))
+    monkeypatch.setattr(engine, "names_file", str(tmp_path / "names.txt"))
+    monkeypatch.setattr(engine, "_roster_stores", {})
+    (tmp_path / "names.txt").write_text("\n  \n", encoding="utf-8")
+    store = engine.get_roster_store()
+    assert engine.get_roster_store() is store
+    assert list(engine.names_on(store, engine.START_DATE)) == engine.DEFAULT_NAMES
+    store.close()
+
+def test_empty_names_are_rejected(store):
+    with pytest.raises(ValueError):
+        store.save_version(THIRTY + [""], datetime(2025, 8, 20))
+    with pytest.raises(ValueError):
+        store.save_version([], datetime(2025, 8, 20))
+    with pytest.raises(ValueError):
+        engine.save_names(THIRTY[:29] + ["  "], datetime(2025, 8, 20))
+    assert [effective for effective, _, _ in store.versions()] == [engine.START_DATE, datetime(2025, 9, 1)]
+
+def test_editing_a_shorter_version_saves_no_blanks(store):
+    # The editor has an entry per name of the widest version (60); the
+    # 30-name version shown on 2025/08/20 leaves the last 30 blank
+    v2 = pytest.importorskip("Rotating_List_v2")
+    date = datetime(2025, 8, 20)
+    shown = list(engine.names_on(store, date))
+    edited = [shown[0] + " Jr"] + shown[1:]
+
+    class Entry:
+        def __init__(self, text):
+            self.text = text
+
+        def get(self):
+            return self.text
+
+    class Editor:
+        name_entries = [Entry(name) for name in edited] + [Entry("") for _ in range(30)]
+        names_saver = engine.NamesSaver()
+
+        def edit_date(self):
+            return date
+
+    editor = Editor()
+    v2.NamesDateApp.auto_save_names(editor)
+    editor.names_saver.flush()
+    assert list(engine.names_on(store, date)) == edited
+    assert all(name for _, names, _ in store.versions() for name in names)